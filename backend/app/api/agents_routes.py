@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import time
-from typing import Generator, Optional
+from typing import AsyncGenerator, Dict, Generator, Optional
 
 from fastapi import APIRouter, Query
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import StreamingResponse
 
-from app.core.sse import format_sse_event
+from app.core.serialization import dumps
+from app.core.sse import SSEFrameEncoder, SSEStreamMetrics, encode_sse_event
+from app.core.tracing import current_trace
+from app.services.admission import Priority
+from app.services.batch_runner import BatchItem, run_batch
 from app.services.orchestrator import orchestrator
 from app.services.context_store import context_store
 
@@ -21,6 +26,9 @@ class AgentMessageRequest(BaseModel):
     model: Optional[str] = None
     provider: Optional[str] = None
     chat_id: Optional[int] = None
+    # Streams only: set False when the client assembles the answer from the content events
+    # and does not need it repeated in the final `done` event
+    include_full_text: bool = True
 
 
 class AgentMessageResponse(BaseModel):
@@ -28,55 +36,95 @@ class AgentMessageResponse(BaseModel):
 
 
 @router.post("/message", response_model=AgentMessageResponse)
-def agent_message(
+async def agent_message(
     request_body: AgentMessageRequest,
     session_id: str = Query("default"),
 ) -> AgentMessageResponse:
-    full_text = ""
-    for chunk in orchestrator.stream(
+    # Queue for the provider on the event loop, then make one non-streaming provider call
+    # on a worker thread; phase timings reach the client through the Server-Timing header
+    # set by the app middleware
+    ticket = await orchestrator.admit(
         session_id=session_id,
-        prompt=request_body.prompt,
         provider=request_body.provider,
         model=request_body.model,
-        temperature=request_body.temperature,
-    ):
-        full_text += chunk
-    return AgentMessageResponse(text=full_text)
+        priority=Priority.NON_STREAMING,
+    )
+    try:
+        completion = await run_in_threadpool(
+            orchestrator.complete,
+            session_id=session_id,
+            prompt=request_body.prompt,
+            temperature=request_body.temperature,
+            priority=Priority.NON_STREAMING,
+            ticket=ticket,
+        )
+    finally:
+        ticket.release()
+    return AgentMessageResponse(text=completion.text)
 
 
 @router.post("/stream")
-def agent_stream(
+async def agent_stream(
     request_body: AgentMessageRequest,
     session_id: str = Query("default"),
 ) -> StreamingResponse:
     request_identifier = str(int(time.time() * 1000))
-
-    def event_generator() -> Generator[str, None, None]:
-        # Kick off orchestrator to resolve / create chat_id
-        stream_iter = orchestrator.stream(
+    sse_metrics = SSEStreamMetrics("/api/agents/stream")
+    trace = current_trace()
+
+    # Take a provider slot and resolve / create chat_id before the response starts, so that
+    # admission control can still answer 429/503 with Retry-After. The queue wait happens on
+    # the event loop: a waiting request must not hold a worker thread that the streams
+    # ahead of it need for their next chunk.
+    ticket = await orchestrator.admit(
+        session_id=session_id,
+        provider=request_body.provider,
+        model=request_body.model,
+    )
+    try:
+        stream_iter = await run_in_threadpool(
+            orchestrator.stream,
             session_id=session_id,
             prompt=request_body.prompt,
-            provider=request_body.provider,
-            model=request_body.model,
             temperature=request_body.temperature,
             chat_id=request_body.chat_id,
+            ticket=ticket,
         )
+    finally:
+        ticket.release()
+    resolved_chat_id = stream_iter.chat_id
 
-        resolved_chat_id = getattr(stream_iter, "chat_id", request_body.chat_id)
+    include_full_text = request_body.include_full_text
+    content_frames = SSEFrameEncoder("BOT_Response", request_identifier)
 
-        yield format_sse_event("start", {"requestId": request_identifier, "chatId": resolved_chat_id})
-        yield format_sse_event("BOT_THINKING", {"requestId": request_identifier, "content": "Thinking..."})
+    def event_generator() -> Generator[bytes, None, None]:
+        yield encode_sse_event("start", {"requestId": request_identifier, "chatId": resolved_chat_id})
+        yield encode_sse_event("BOT_THINKING", {"requestId": request_identifier, "content": "Thinking..."})
 
-        full_text_response = ""
+        chunks: list[str] = []
         try:
             for text_chunk in stream_iter:
-                full_text_response += text_chunk
-                yield format_sse_event("BOT_Response", {"requestId": request_identifier, "content": text_chunk})
-
-            yield format_sse_event("done", {"requestId": request_identifier, "content": full_text_response})
-
+                if include_full_text:
+                    chunks.append(text_chunk)
+                sse_metrics.content()
+                yield content_frames.encode(text_chunk)
+
+            done: Dict[str, object] = {"requestId": request_identifier}
+            if include_full_text:
+                done["content"] = "".join(chunks)
+            yield encode_sse_event("done", done)
+            sse_metrics.finish("completed")
+            # Headers went out before the provider call, so stream phase timings as a last event
+            yield encode_sse_event("meta", {"requestId": request_identifier, "timings": trace.as_dict()})
+
+        except GeneratorExit:
+            # Client went away; closing the orchestrator stream cancels the provider call
+            sse_metrics.finish("disconnected")
+            stream_iter.close()
+            raise
         except Exception as exception:  # pragma: no cover - safety net for streaming
-            yield format_sse_event("error", {"requestId": request_identifier, "message": str(exception)})
+            sse_metrics.finish("error")
+            yield encode_sse_event("error", {"requestId": request_identifier, "message": str(exception)})
 
     headers = {
         "Cache-Control": "no-cache",
@@ -87,6 +135,36 @@ def agent_stream(
     return StreamingResponse(event_generator(), media_type="text/event-stream", headers=headers)
 
 
+class BatchPromptItem(BaseModel):
+    id: Optional[str] = Field(default=None, description="Caller-supplied identifier echoed in the result")
+    prompt: str = Field(min_length=1)
+    temperature: float = Field(default=0.3, ge=0.0, le=2.0)
+    model: Optional[str] = None
+    provider: Optional[str] = None
+    chat_id: Optional[int] = None
+
+
+class BatchPromptRequest(BaseModel):
+    items: list[BatchPromptItem] = Field(min_length=1, max_length=1000)
+    # Per-provider parallelism, capped by the server-side limits
+    concurrency: Optional[Dict[str, int]] = None
+
+
+@router.post("/batch")
+async def agent_batch(
+    request_body: BatchPromptRequest,
+    session_id: str = Query("default"),
+) -> StreamingResponse:
+    """Run many prompts concurrently; results stream back as NDJSON in completion order."""
+    items = [BatchItem(**item.model_dump()) for item in request_body.items]
+
+    async def ndjson() -> AsyncGenerator[bytes, None]:
+        async for record in run_batch(items, session_id=session_id, concurrency=request_body.concurrency):
+            yield dumps(record) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+
 class AgentPreferenceRequest(BaseModel):
     provider: str = Field(pattern="^(gemini|ollama)$")
     model: str
@@ -9,6 +9,7 @@ from starlette.responses import StreamingResponse
 
 from app.core.sse import format_sse_event
 from app.services.gemini_service import GeminiService
+from app.services.llm_base import PromptMessage
 
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
@@ -94,12 +95,9 @@ class ChatMessageResponse(BaseModel):
 @router.post("/message", response_model=ChatMessageResponse)
 def chat_message(request_body: ChatMessageRequest) -> ChatMessageResponse:
     """Non-streaming chat endpoint that returns the final text response."""
-    full_text = ""
-    for chunk in gemini_service.stream_text_response(
-        prompt=request_body.prompt,
+    text = gemini_service.complete_messages_response(
+        [PromptMessage("user", request_body.prompt)],
         model_name=request_body.model,
         temperature=request_body.temperature,
-    ):
-        full_text += chunk
-
-    return ChatMessageResponse(text=full_text)
+    )
+    return ChatMessageResponse(text=text)
@@ -1,24 +1,41 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import zlib
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response, StreamingResponse
 
-from app.core.db import Base, engine, get_db
+from app.core.auth import require_admin
+from app.core.db import Base, async_engine, engine, get_async_db
+from app.core.pagination import cache_headers, decode_cursor, make_etag, not_modified, split_page
+from app.core.serialization import FastJSONResponse
+from app.services.chat_transfer import export_ndjson, import_ndjson
 from app.services.context_store import context_store
 from app.services.rag_store import rag_store
-from app.models import Chat, Message
+from app.services.search import search_messages
+from app.core.settings import settings
+from app.models import Chat, ChatArchive, Message, ensure_sqlite_fts
+from app.services.archiver import archive_idle_chats, restore_archived
 
 
 router = APIRouter(prefix="/api/chats", tags=["chats"])
+logger = logging.getLogger("app.chats")
+_archive_task: Optional[asyncio.Task] = None
 
 
 class ChatOut(BaseModel):
     id: int
     session_id: str
     title: str
+    message_count: int = 0
+    last_message_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -40,23 +57,169 @@ class MessageOut(BaseModel):
         from_attributes = True
 
 
+class SearchHit(BaseModel):
+    message_id: int
+    chat_id: int
+    chat_title: str
+    role: str
+    created_at: str
+    score: float
+    highlight: str
+
+
+class SearchPage(BaseModel):
+    items: list[SearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ChatPage(BaseModel):
+    items: list[ChatOut]
+    next_cursor: Optional[str] = None
+
+
+class MessagePage(BaseModel):
+    items: list[MessageOut]
+    next_cursor: Optional[str] = None
+
+
 @router.on_event("startup")
 def create_tables() -> None:
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        ensure_sqlite_fts(connection)
+
+
+async def _archive_periodically(interval: int) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(archive_idle_chats)
+        except Exception:  # noqa: BLE001 - keep the schedule alive
+            logger.exception("chat archival run failed")
+
+
+@router.on_event("startup")
+async def start_archiver() -> None:
+    global _archive_task
+    if settings.archive_interval_seconds > 0:
+        _archive_task = asyncio.create_task(_archive_periodically(settings.archive_interval_seconds))
+
 
+@router.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    if _archive_task is not None:
+        _archive_task.cancel()
+    await async_engine.dispose()
 
-@router.get("/", response_model=list[ChatOut])
-def list_chats(session_id: str = Query(...), db: Session = Depends(get_db)) -> list[ChatOut]:
-    rows = db.query(Chat).filter(Chat.session_id == session_id).order_by(Chat.id.desc()).all()
-    return [ChatOut.model_validate(r) for r in rows]
+
+@router.get("/", response_model=ChatPage)
+async def list_chats(
+    request: Request,
+    session_id: str = Query(...),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Most-recently-active-first keyset page of chats.
+
+    Served from the (session_id, last_message_at, id) index and revalidated with
+    If-None-Match against a cheap (count, max updated_at) marker.
+    """
+    after = decode_cursor(cursor)
+    count, last_update = (
+        await db.execute(
+            select(func.count(Chat.id), func.max(Chat.updated_at)).where(Chat.session_id == session_id)
+        )
+    ).one()
+    etag = make_etag("chats", session_id, count, last_update, cursor, limit)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    stmt = select(Chat.id, Chat.session_id, Chat.title, Chat.message_count, Chat.last_message_at).where(
+        Chat.session_id == session_id
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(Chat.last_message_at, Chat.id) < after)
+    rows = (
+        await db.execute(stmt.order_by(Chat.last_message_at.desc(), Chat.id.desc()).limit(limit + 1))
+    ).all()
+    page, next_cursor = split_page(list(rows), limit, sort_key="last_message_at")
+    body = {
+        "items": [
+            {
+                "id": r.id,
+                "session_id": r.session_id,
+                "title": r.title,
+                "message_count": r.message_count,
+                "last_message_at": r.last_message_at.isoformat(),
+            }
+            for r in page
+        ],
+        "next_cursor": next_cursor,
+    }
+    return FastJSONResponse(body, headers=cache_headers(etag))
+
+
+@router.get("/search", response_model=SearchPage)
+async def search_chats(
+    session_id: str = Query(...),
+    q: str = Query(..., min_length=1, description="Search terms"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+) -> SearchPage:
+    """Ranked full-text search over a session's messages with highlighted snippets."""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+    after = decode_cursor(cursor, float)
+    items, next_cursor = await search_messages(db, session_id=session_id, query=q, limit=limit, after=after)
+    return SearchPage(items=[SearchHit(**item) for item in items], next_cursor=next_cursor)
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_chats(
+    session_id: Optional[str] = Query(None, description="Limit the export to one session; all chats when omitted"),
+    gzip: bool = Query(False, description="Gzip-compress the NDJSON stream"),
+) -> StreamingResponse:
+    """Stream chats then messages as NDJSON from server-side cursors (admin only)."""
+    filename = "chats.ndjson.gz" if gzip else "chats.ndjson"
+    return StreamingResponse(
+        export_ndjson(session_id, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+class ImportResult(BaseModel):
+    chats: int
+    messages: int
+    skipped: int
+
+
+@router.post("/import", response_model=ImportResult, dependencies=[Depends(require_admin)])
+async def import_chats(
+    request: Request,
+    session_id: Optional[str] = Query(None, description="Assign every imported chat to this session"),
+) -> ImportResult:
+    """Ingest an NDJSON export (raw body; gzip via Content-Encoding or Content-Type) in one transaction (admin only)."""
+    compressed = (
+        "gzip" in request.headers.get("content-encoding", "")
+        or request.headers.get("content-type", "").startswith("application/gzip")
+    )
+    try:
+        stats = await import_ndjson(request.stream(), compressed=compressed, session_id=session_id)
+    except (ValueError, KeyError, zlib.error) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid NDJSON export: {exc}") from exc
+    return ImportResult(**stats)
 
 
 @router.post("/", response_model=ChatOut)
-def create_chat(body: ChatCreate, db: Session = Depends(get_db)) -> ChatOut:
+async def create_chat(body: ChatCreate, db: AsyncSession = Depends(get_async_db)) -> ChatOut:
     chat = Chat(session_id=body.session_id, title=body.title)
     db.add(chat)
-    db.commit()
-    db.refresh(chat)
+    await db.commit()
+    await db.refresh(chat)
     # Clear any uploaded file context and vector index for this session
     context_store.set_text(body.session_id, "")
     rag_store.clear(body.session_id)
@@ -64,27 +227,61 @@ def create_chat(body: ChatCreate, db: Session = Depends(get_db)) -> ChatOut:
 
 
 @router.delete("/{chat_id}", response_model=ChatOut)
-def delete_chat(chat_id: int, db: Session = Depends(get_db)) -> ChatOut:
-    chat = db.get(Chat, chat_id)
+async def delete_chat(chat_id: int, db: AsyncSession = Depends(get_async_db)) -> ChatOut:
+    chat = await db.get(Chat, chat_id)
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
-    db.delete(chat)
-    db.commit()
-    return ChatOut.model_validate(chat)
+    deleted = ChatOut.model_validate(chat)
+    # Delete children explicitly so the async session never lazy-loads the collection
+    # (and SQLite without foreign_keys=ON still cleans up)
+    await db.execute(delete(Message).where(Message.chat_id == chat_id))
+    await db.execute(delete(ChatArchive).where(ChatArchive.chat_id == chat_id))
+    await db.delete(chat)
+    await db.commit()
+    return deleted
+
 
+@router.get("/{chat_id}/messages", response_model=MessagePage)
+async def list_messages(
+    request: Request,
+    chat_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Oldest-first keyset page of a chat's messages, revalidated against the chat's updated_at marker."""
+    after = decode_cursor(cursor)
+    marker, archived_at = (
+        await db.execute(select(Chat.updated_at, Chat.archived_at).where(Chat.id == chat_id))
+    ).one_or_none() or (None, None)
+    etag = make_etag("messages", chat_id, marker, cursor, limit)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
 
-@router.get("/{chat_id}/messages", response_model=list[MessageOut])
-def list_messages(chat_id: int, db: Session = Depends(get_db)) -> list[MessageOut]:
-    msgs = (
-        db.query(Message)
-        .filter(Message.chat_id == chat_id)
-        .order_by(Message.created_at.asc(), Message.id.asc())
-        .all()
+    if archived_at is not None:
+        # Cold chat being read again: restore it once, off the event loop, so this and later
+        # pages come from the hot table instead of inflating the whole archive per page
+        await asyncio.to_thread(restore_archived, chat_id)
+    # Select plain columns: no ORM identity map or per-row Pydantic model on the hot path
+    stmt = select(Message.id, Message.chat_id, Message.role, Message.content, Message.created_at).where(
+        Message.chat_id == chat_id
     )
-    return [MessageOut.model_validate({
-        "id": m.id,
-        "chat_id": m.chat_id,
-        "role": m.role,
-        "content": m.content,
-        "created_at": m.created_at.isoformat(),
-    }) for m in msgs]
+    if after is not None:
+        stmt = stmt.where(tuple_(Message.created_at, Message.id) > after)
+    rows = (await db.execute(stmt.order_by(Message.created_at.asc(), Message.id.asc()).limit(limit + 1))).all()
+    page, next_cursor = split_page(list(rows), limit)
+    body = {
+        "items": [
+            {
+                "id": m.id,
+                "chat_id": m.chat_id,
+                "role": m.role,
+                "content": m.content,
+                "created_at": m.created_at.isoformat(),
+            }
+            for m in page
+        ],
+        "next_cursor": next_cursor,
+    }
+    return FastJSONResponse(body, headers=cache_headers(etag))
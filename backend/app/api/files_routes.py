@@ -4,8 +4,6 @@ import io
 import csv as _csv
 from typing import Dict
 
-import pandas as pd
-import PyPDF2
 from fastapi import APIRouter, File, HTTPException, UploadFile, Query
 
 from app.services.context_store import context_store
@@ -23,6 +21,8 @@ async def upload_file(
     try:
         fname = (file.filename or "").lower()
         if fname.endswith(".pdf"):
+            import PyPDF2  # heavy; imported on first PDF upload
+
             reader = PyPDF2.PdfReader(file.file)
             text = "\n".join(page.extract_text() or "" for page in reader.pages)
             context_store.set_text(session_id, text)
@@ -80,6 +80,8 @@ async def upload_file(
                     sep = ","
 
             # Try reading with pandas, then retry with fallbacks (decimal/thousands, alt sep)
+            import pandas as pd  # heavy; imported on first CSV upload
+
             def _read_csv(text: str, **kwargs):
                 return pd.read_csv(io.StringIO(text), **kwargs)
 
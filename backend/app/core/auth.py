@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.settings import settings
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency for operator-only endpoints: `X-Admin-Token` must match ADMIN_TOKEN."""
+    # Hidden entirely unless ADMIN_TOKEN is configured
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import gzip
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter
+
+try:
+    import brotli
+except Exception:  # pragma: no cover
+    brotli = None  # type: ignore[assignment]
+
+
+COMPRESSED_RESPONSES = Counter(
+    "http_compressed_responses_total",
+    "Responses compressed by the compression middleware",
+    ["encoding"],  # br | gzip
+)
+COMPRESSION_SAVED_BYTES = Counter(
+    "http_compression_saved_bytes_total",
+    "Response bytes saved by compression",
+    ["encoding"],
+)
+
+_COMPRESSIBLE_TYPES = (b"application/json", b"text/plain", b"text/html", b"text/csv")
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    offered = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Pure ASGI brotli/gzip compression for large, complete responses.
+
+    Only responses that declare a Content-Length of at least `minimum_size` and a
+    compressible content type are compressed; anything without a length (SSE, NDJSON
+    exports and other streams) passes through unbuffered. Brotli is used when the
+    `brotli` package is installed and the client accepts it, gzip otherwise.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        accept = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"accept-encoding"), "")
+        encoding = _choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Dict[str, Any]] = None
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self._should_compress(message["headers"]):
+                    start = message
+                    return
+                await send(message)
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_compressed(send, start, b"".join(chunks), encoding)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, headers: List[tuple]) -> bool:
+        length: Optional[int] = None
+        content_type = b""
+        for key, value in headers:
+            if key == b"content-encoding":
+                return False
+            if key == b"content-length":
+                length = int(value)
+            elif key == b"content-type":
+                content_type = value
+        return length is not None and length >= self.minimum_size and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+    async def _send_compressed(self, send: Any, start: Dict[str, Any], body: bytes, encoding: str) -> None:
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        headers = [(k, v) for k, v in start["headers"] if k not in (b"content-length", b"etag", b"vary")]
+        vary = [v for k, v in start["headers"] if k == b"vary"]
+        etag = next((v for k, v in start["headers"] if k == b"etag"), None)
+        headers += [
+            (b"content-encoding", encoding.encode("latin-1")),
+            (b"content-length", str(len(compressed)).encode("latin-1")),
+            (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+        ]
+        if etag is not None:
+            # A different representation needs a different validator; weak is enough for revalidation
+            headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+        COMPRESSED_RESPONSES.labels(encoding=encoding).inc()
+        COMPRESSION_SAVED_BYTES.labels(encoding=encoding).inc(max(len(body) - len(compressed), 0))
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": compressed})
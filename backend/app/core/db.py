@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import time
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from prometheus_client import Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from app.core.settings import get_database_settings
 
@@ -10,18 +18,107 @@ class Base(DeclarativeBase):
     pass
 
 
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def _timed_pool(base: type[QueuePool], label: str) -> type[QueuePool]:
+    """Subclass a queue pool so that every checkout records its wait time."""
+
+    class _TimedPool(base):  # type: ignore[misc, valid-type]
+        def _do_get(self):  # noqa: ANN202 - mirrors SQLAlchemy's private signature
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                DB_POOL_WAIT.labels(engine=label).observe(time.perf_counter() - start)
+
+    _TimedPool.__name__ = f"Timed{base.__name__}"
+    return _TimedPool
+
+
 def _make_engine_url() -> str:
     db = get_database_settings()
     return db.DATABASE_URL
 
 
-engine = create_engine(_make_engine_url(), pool_pre_ping=True)
+def _make_async_engine_url() -> str:
+    db = get_database_settings()
+    if db.DATABASE_ASYNC_URL:
+        return db.DATABASE_ASYNC_URL
+    url = make_url(db.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+def _pool_kwargs(url: str, base: type[QueuePool], label: str) -> Dict[str, Any]:
+    # SQLite picks its own pool implementation (single connection / static); only size server databases
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    db = get_database_settings()
+    return {
+        "poolclass": _timed_pool(base, label),
+        "pool_size": db.DB_POOL_SIZE,
+        "max_overflow": db.DB_MAX_OVERFLOW,
+        "pool_timeout": db.DB_POOL_TIMEOUT,
+        "pool_recycle": db.DB_POOL_RECYCLE,
+    }
+
+
+_engine_url = _make_engine_url()
+engine = create_engine(_engine_url, pool_pre_ping=True, **_pool_kwargs(_engine_url, QueuePool, "sync"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_engine_url = _make_async_engine_url()
+async_engine = create_async_engine(
+    _async_engine_url,
+    pool_pre_ping=True,
+    **_pool_kwargs(_async_engine_url, AsyncAdaptedQueuePool, "async"),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class _PoolCollector:
+    """Expose live pool occupancy at scrape time rather than tracking it via events."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["engine"])
+        idle = GaugeMetricFamily("db_pool_idle", "Idle connections held by the pool", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections opened beyond pool_size", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        pools: Dict[str, Pool] = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+        for label, pool in pools.items():
+            if not isinstance(pool, QueuePool):
+                continue
+            checked_out.add_metric([label], pool.checkedout())
+            idle.add_metric([label], pool.checkedin())
+            overflow.add_metric([label], max(pool.overflow(), 0))
+            size.add_metric([label], pool.size())
+        yield checked_out
+        yield idle
+        yield overflow
+        yield size
+
 
-def get_db():
+REGISTRY.register(_PoolCollector())
+
+
+def get_db() -> Iterator[Session]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
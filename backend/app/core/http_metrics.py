@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.core.settings import settings
+from app.core.tracing import start_trace
+
+
+logger = logging.getLogger("app.access")
+
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "path", "status"],  # path is the route template, e.g. /api/chats/{chat_id}/messages
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response starts",
+    ["method", "path"],
+)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """The path template of the route that handled the request, or UNMATCHED_ROUTE."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware for request metrics, access logs and phase timings.
+
+    Metrics are labelled by route template so per-chat paths do not create new series.
+    The access log is sampled (ACCESS_LOG_SAMPLE_RATE); server errors and requests slower
+    than ACCESS_LOG_SLOW_SECONDS are always logged. Response bodies pass through untouched,
+    so streaming responses are not re-wrapped or buffered. Latency is taken when the
+    response starts; streams are timed by the SSE metrics.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        # Route handlers (and the threadpool work they start) record phases on this trace
+        trace = start_trace(f"{scope['method']} {scope['path']}")
+        status: Optional[int] = None
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                self._record(scope, status, time.perf_counter() - start_time)
+                # Complete for regular responses; for streams it covers the work before the first byte
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", trace.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            if status is None:
+                self._record(scope, 500, time.perf_counter() - start_time)
+            raise
+        finally:
+            trace.export()
+
+    @staticmethod
+    def _record(scope: Dict[str, Any], status: int, duration: float) -> None:
+        method = scope["method"]
+        path = route_template(scope)
+        REQUEST_COUNT.labels(method=method, path=path, status=str(status)).inc()
+        REQUEST_LATENCY.labels(method=method, path=path).observe(duration)
+        if (
+            status >= 500
+            or duration >= settings.access_log_slow_seconds
+            or random.random() < settings.access_log_sample_rate
+        ):
+            logger.info(
+                "%s %s -> %s in %.3fs",
+                method,
+                scope["path"],
+                status,
+                duration,
+                extra={"method": method, "route": path, "status": status, "duration_ms": round(duration * 1000, 2)},
+            )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+
+
+def encode_cursor(sort_value: Union[datetime, float], row_id: int) -> str:
+    """Opaque keyset cursor pointing at the last row of a page (sorted by timestamp or score)."""
+    value = sort_value.isoformat() if isinstance(sort_value, datetime) else float(sort_value)
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], kind: Type[Union[datetime, float]] = datetime
+) -> Optional[Tuple[Union[datetime, float], int]]:
+    """Decode a cursor whose sort value must be of `kind` (a timestamp or a score); 400 otherwise."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if kind is datetime and isinstance(sort_value, str):
+            return datetime.fromisoformat(sort_value), int(row_id)
+        if kind is float and isinstance(sort_value, (int, float)) and not isinstance(sort_value, bool):
+            return float(sort_value), int(row_id)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from a change marker plus whatever selects the page (cursor, limit)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response when the client's If-None-Match already has this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # no-cache: clients may store the body but must revalidate with If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def split_page(rows: list, limit: int, sort_key: str = "created_at") -> Tuple[list, Optional[str]]:
+    """Trim a `limit + 1` fetch to one page and derive the next cursor from its last row."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(getattr(last, sort_key), last.id)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Modules whose allocations are always reported by `MemoryProfiler.diff`
+FOCUS_MODULES = (
+    "app.services.context_store",
+    "app.services.rag_store",
+    "app.core.sse",
+    "app.api.agents_routes",
+)
+
+# Innermost frames of threads that are parked rather than running: lock and condition
+# waits, idle worker queues and the event loop's select. Waits inside other C calls
+# (time.sleep, socket reads) look like their caller and are still sampled.
+IDLE_FRAMES = frozenset({
+    ("threading", "wait"),
+    ("threading", "_wait_for_tstate_lock"),
+    ("queue", "get"),
+    ("selectors", "select"),
+    ("concurrent.futures.thread", "_worker"),
+})
+
+
+class ProfilerBusy(RuntimeError):
+    """A CPU profile is already running."""
+
+
+@functools.lru_cache(maxsize=4096)
+def _module_name(filename: str) -> str:
+    """Best-effort dotted module name for a source file, based on the longest sys.path prefix."""
+    path = os.path.abspath(filename)
+    best = ""
+    for entry in sys.path:
+        root = os.path.abspath(entry or ".") + os.sep
+        if path.startswith(root) and len(root) > len(best):
+            best = root
+    relative = path[len(best):] if best else os.path.basename(path)
+    module = os.path.splitext(relative)[0].replace(os.sep, ".")
+    return module[: -len(".__init__")] if module.endswith(".__init__") else module
+
+
+class CPUProfiler:
+    """Sampling profiler over all Python threads, output as collapsed stacks.
+
+    While `sample()` runs, a thread reads `sys._current_frames()` every `interval`
+    seconds; nothing is installed in the interpreter, so there is no cost when idle.
+    Threads parked in a known wait (`IDLE_FRAMES`) are skipped, so the profile shows
+    where threads are busy rather than where idle ones sit.
+    Output lines are "frame;frame;frame count", root first, as consumed by
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval: float = 0.01) -> str:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("a CPU profile is already running")
+        try:
+            stacks: Counter[str] = Counter()
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me or self._idle(frame):
+                        continue
+                    stacks[self._collapse(frame)] += 1
+                time.sleep(interval)
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _idle(frame) -> bool:
+        code = frame.f_code
+        return (_module_name(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{_module_name(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots on demand: `start()` begins tracing and takes a baseline,
+    `diff()` compares a new snapshot against it, `stop()` ends tracing.
+
+    tracemalloc is off until `start()`, so allocations cost nothing extra otherwise.
+    """
+
+    def __init__(self) -> None:
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._baseline = None
+            tracemalloc.stop()
+
+    def diff(self, top: int = 25, reset: bool = False) -> Dict[str, object]:
+        """Allocation growth since the baseline, grouped by module."""
+        with self._lock:
+            if self._baseline is None or not tracemalloc.is_tracing():
+                raise RuntimeError("memory tracing is not started")
+            current = self._snapshot()
+            by_module: Dict[str, List[int]] = {}
+            for stat in current.compare_to(self._baseline, "filename"):
+                module = _module_name(stat.traceback[0].filename)
+                totals = by_module.setdefault(module, [0, 0, 0])
+                totals[0] += stat.size_diff
+                totals[1] += stat.count_diff
+                totals[2] += stat.size
+            if reset:
+                self._baseline = current
+        traced, peak = tracemalloc.get_traced_memory()
+
+        def row(module: str, totals: List[int]) -> Dict[str, object]:
+            return {
+                "module": module,
+                "size_diff_kb": round(totals[0] / 1024, 1),
+                "count_diff": totals[1],
+                "size_kb": round(totals[2] / 1024, 1),
+            }
+
+        ranked = sorted(by_module.items(), key=lambda item: abs(item[1][0]), reverse=True)
+        return {
+            "traced_kb": round(traced / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "top": [row(module, totals) for module, totals in ranked[:top]],
+            "focus": [row(module, by_module.get(module, [0, 0, 0])) for module in FOCUS_MODULES],
+        }
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # Leave out tracemalloc's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<unknown>"))
+        )
+
+
+cpu_profiler = CPUProfiler()
+memory_profiler = MemoryProfiler()
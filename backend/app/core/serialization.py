@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed, the standard library otherwise."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from functools import lru_cache
 
@@ -13,6 +13,85 @@ class AppSettings(BaseSettings):
     # OpenAI
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o-mini"
+    # Rolling conversation summary: fold older turns every N assistant turns,
+    # keeping this many of the most recent messages verbatim in the prompt
+    summary_every_n_turns: int = 4
+    summary_recent_messages: int = 6
+    summary_max_chars: int = 2000
+    # Cold storage: chats idle longer than this move to compressed chat_archives rows.
+    # The periodic job is off unless an interval is configured.
+    archive_idle_days: int = 30
+    archive_interval_seconds: int = 0
+    # Batch prompts: concurrent generations per provider, optionally overridden per provider
+    # ("ollama=1,openai=8"), and request-rate ceilings per provider in requests/second
+    batch_max_concurrency: int = 4
+    batch_concurrency_overrides: str = "ollama=1"
+    provider_rate_limits: str = ""
+    # Admission control in front of providers: concurrent generations per provider or
+    # provider:model ("ollama=1,openai:gpt-4o=16"), bounded wait queue and wait budget
+    admission_limits: str = "ollama=1"
+    admission_default_limit: int = 8
+    admission_max_queue: int = 32
+    admission_max_wait_seconds: float = 30.0
+    # Circuit breakers: open after N consecutive failures (or first chunks slower than the
+    # slow-call threshold), reject for reset_seconds, and probe health in the background
+    circuit_failure_threshold: int = 3
+    circuit_slow_call_seconds: float = 20.0
+    circuit_reset_seconds: float = 30.0
+    circuit_probe_interval_seconds: float = 10.0
+    # Failover chains tried in order when a provider fails before its first chunk or its
+    # circuit is open, e.g. "ollama=gemini,openai=gemini:gemini-2.5-flash|ollama:llama3.2"
+    provider_fallbacks: str = ""
+    # Hedging: if the primary has not produced a first chunk within the HEDGE_PERCENTILE
+    # of its recent first-chunk latency, race the first PROVIDER_FALLBACKS target against it.
+    # At most HEDGE_BUDGET_FRACTION of requests are hedged.
+    hedge_enabled: bool = False
+    hedge_percentile: float = 0.95
+    hedge_default_delay_seconds: float = 2.0
+    hedge_min_delay_seconds: float = 0.1
+    hedge_budget_fraction: float = 0.05
+    # Outbound HTTP to providers: shared keep-alive pools (HTTP/2 when `h2` is installed)
+    # and a cache of SDK clients per model/key/temperature class
+    http2_enabled: bool = True
+    http_max_connections: int = 20
+    http_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 60.0
+    client_cache_size: int = 32
+    # Ollama model residency: keep_alive sent with every request (per-model overrides in
+    # seconds, "llama3.2=3600"), models loaded at startup, and how often to poll /api/ps.
+    # A fixed num_ctx (0 = server default) avoids reloads caused by differing options.
+    ollama_keep_alive: str = "30m"
+    ollama_keep_alive_overrides: str = ""
+    ollama_warm_models: str = ""
+    ollama_residency_poll_seconds: float = 30.0
+    ollama_num_ctx: int = 0
+    # Per-request phase tracing: timings are always returned (Server-Timing / SSE `meta`);
+    # with OTEL_ENABLED the spans are also exported over OTLP/HTTP (needs opentelemetry-sdk
+    # and opentelemetry-exporter-otlp-proto-http; empty endpoint = exporter default)
+    otel_enabled: bool = False
+    otel_endpoint: str = ""
+    otel_service_name: str = "ai-chatbot-backend"
+    # Record/replay of provider streams (NDJSON, gzip when the path ends in .gz). With
+    # LLM_RECORD_PATH every provider's streams are appended to the file; with LLM_REPLAY_PATH
+    # all providers are served from the recordings, delays multiplied by LLM_REPLAY_TIME_SCALE
+    llm_record_path: str = ""
+    llm_replay_path: str = ""
+    llm_replay_time_scale: float = 1.0
+    # Token for the /debug profiling endpoints (X-Admin-Token header); unset disables them
+    admin_token: Optional[str] = None
+    # Worker threads for sync routes and sync streaming generators (AnyIO's default is 40).
+    # THREADPOOL_RESERVE of them serve only /health, /metrics and /debug, so those still
+    # answer when streams hold every other thread. The loop monitor samples occupancy and
+    # event-loop lag every interval (0 = off) and warns after sustained saturation.
+    threadpool_size: int = 40
+    threadpool_reserve: int = 4
+    loop_monitor_interval_seconds: float = 0.5
+    threadpool_saturation_warn_seconds: float = 5.0
+    # Access log: fraction of requests logged; errors and slow requests are always logged
+    access_log_sample_rate: float = 0.1
+    access_log_slow_seconds: float = 1.0
+    # Brotli (when installed) or gzip for complete responses of at least this many bytes (0 = off)
+    compression_min_bytes: int = 1024
 
     # Pydantic v2 style settings config
     model_config = SettingsConfigDict(
@@ -25,6 +104,14 @@ class AppSettings(BaseSettings):
 class DatabaseSettings(BaseSettings):
     # Provide a safe default using environment; override in .env
     DATABASE_URL: str
+    # Optional async URL; derived from DATABASE_URL (asyncpg / aiosqlite driver) when unset
+    DATABASE_ASYNC_URL: Optional[str] = None
+
+    # Connection pool sizing, applied to both the sync and async engines
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
 
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).resolve().parents[1] / ".env"),
@@ -32,6 +119,36 @@ class DatabaseSettings(BaseSettings):
     )
 
 
+def parse_provider_map(value: str) -> Dict[str, float]:
+    """Parse "name=value,name=value" settings into a dict, ignoring malformed entries."""
+    parsed: Dict[str, float] = {}
+    for entry in value.split(","):
+        name, sep, raw = entry.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            parsed[name.strip()] = float(raw)
+        except ValueError:
+            continue
+    return parsed
+
+
+def parse_fallbacks(value: str) -> Dict[str, List[Tuple[str, Optional[str]]]]:
+    """Parse "primary=provider[:model]|provider[:model],..." into ordered fallback chains."""
+    chains: Dict[str, List[Tuple[str, Optional[str]]]] = {}
+    for entry in value.split(","):
+        primary, sep, targets = entry.partition("=")
+        if not sep or not primary.strip():
+            continue
+        chain: List[Tuple[str, Optional[str]]] = []
+        for target in targets.split("|"):
+            provider, _, model = target.strip().partition(":")
+            if provider:
+                chain.append((provider, model or None))
+        chains[primary.strip()] = chain
+    return chains
+
+
 @lru_cache(maxsize=1)
 def get_database_settings() -> DatabaseSettings:
     return DatabaseSettings()
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
-import json
 import asyncio
+import time
 from typing import Any, Dict, Optional, Callable, Iterator, AsyncGenerator
 import contextlib
 
+from prometheus_client import Counter, Histogram
+
+from app.core.serialization import dumps
+
+
+SSE_TIME_TO_FIRST_CONTENT = Histogram(
+    "sse_time_to_first_content_seconds",
+    "Time from the request reaching the handler to the first content event being yielded",
+    ["route"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 40),
+)
+SSE_STREAM_DURATION = Histogram(
+    "sse_stream_duration_seconds",
+    "Lifetime of an SSE response from handler entry to the last event",
+    ["route"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 20, 40, 80, 160),
+)
+SSE_STREAMS = Counter(
+    "sse_streams_total",
+    "SSE responses by how they ended",
+    ["route", "outcome"],  # completed | disconnected | error
+)
+
 
 def format_sse_event(event_name: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
     """
@@ -15,14 +38,54 @@ def format_sse_event(event_name: str, data: Dict[str, Any], event_id: Optional[s
 
     Each event must end with a blank line.
     """
-    json_payload = json.dumps(data, ensure_ascii=False)
-
-    lines = []
-    if event_id is not None:
-        lines.append(f"id: {event_id}")
-    lines.append(f"event: {event_name}")
-    lines.append(f"data: {json_payload}")
-    return "\n".join(lines) + "\n\n"
+    return encode_sse_event(event_name, data, event_id).decode("utf-8")
+
+
+def encode_sse_event(event_name: str, data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """`format_sse_event` straight to bytes, ready for the response body."""
+    head = f"id: {event_id}\nevent: {event_name}\ndata: " if event_id is not None else f"event: {event_name}\ndata: "
+    return head.encode("utf-8") + dumps(data) + b"\n\n"
+
+
+class SSEFrameEncoder:
+    """Encodes the per-token events of one stream.
+
+    Everything except the content string is identical across a stream's content events,
+    so it is serialized once; each token then costs one JSON string encode.
+    """
+
+    def __init__(self, event_name: str, request_id: str) -> None:
+        prefix = dumps({"requestId": request_id, "content": ""})[: -len(b'""}')]
+        self._prefix = f"event: {event_name}\ndata: ".encode("utf-8") + prefix
+
+    def encode(self, content: str) -> bytes:
+        return self._prefix + dumps(content) + b"}\n\n"
+
+
+class SSEStreamMetrics:
+    """Client-facing stream timings for one SSE response.
+
+    Create it when the request reaches the handler, call `content()` on every content
+    event and `finish()` once with the outcome.
+    """
+
+    def __init__(self, route: str) -> None:
+        self.route = route
+        self.started = time.perf_counter()
+        self._first_content = True
+        self._finished = False
+
+    def content(self) -> None:
+        if self._first_content:
+            self._first_content = False
+            SSE_TIME_TO_FIRST_CONTENT.labels(route=self.route).observe(time.perf_counter() - self.started)
+
+    def finish(self, outcome: str) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        SSE_STREAMS.labels(route=self.route, outcome=outcome).inc()
+        SSE_STREAM_DURATION.labels(route=self.route).observe(time.perf_counter() - self.started)
 
 
 def format_sse_comment(comment: str = "heartbeat") -> str:
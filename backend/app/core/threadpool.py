@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional, TypeVar
+
+import anyio
+import anyio.to_thread
+from prometheus_client import Gauge, Histogram
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger("app.threadpool")
+
+T = TypeVar("T")
+
+THREADPOOL_CAPACITY = Gauge(
+    "threadpool_capacity",
+    "Worker threads available to the pool",
+    ["pool"],  # default | reserved
+)
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Worker threads currently running sync routes or stream steps",
+    ["pool"],
+)
+THREADPOOL_WAITING = Gauge(
+    "threadpool_waiting_tasks",
+    "Tasks queued for a worker thread",
+    ["pool"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a periodic timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+# Sync routes and sync streaming generators run on AnyIO's default limiter; health,
+# metrics and admin endpoints use this separate reserve so they answer during saturation
+_reserved: Optional[anyio.CapacityLimiter] = None
+
+
+def configure_threadpool() -> None:
+    """Size the default limiter to THREADPOOL_SIZE minus THREADPOOL_RESERVE. Must run on the event loop."""
+    global _reserved
+    reserve = max(settings.threadpool_reserve, 0)
+    default = anyio.to_thread.current_default_thread_limiter()
+    default.total_tokens = max(settings.threadpool_size - reserve, 1)
+    _reserved = anyio.CapacityLimiter(max(reserve, 1))
+    THREADPOOL_CAPACITY.labels(pool="default").set(default.total_tokens)
+    THREADPOOL_CAPACITY.labels(pool="reserved").set(_reserved.total_tokens)
+
+
+async def run_reserved(func: Callable[..., T], *args: object) -> T:
+    """Run a sync call on the reserved threads, bypassing a saturated default pool."""
+    return await anyio.to_thread.run_sync(func, *args, limiter=_reserved)
+
+
+class LoopMonitor:
+    """Periodic task on the event loop: measures its wake-up lag, exports threadpool
+    occupancy, and warns when the default pool stays saturated (every thread busy and
+    tasks waiting) for longer than THREADPOOL_SATURATION_WARN_SECONDS."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._saturated_since: Optional[float] = None
+        self._warned = False
+
+    def start(self) -> None:
+        if self._task is None and settings.loop_monitor_interval_seconds > 0:
+            self._task = asyncio.create_task(self._run(settings.loop_monitor_interval_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            EVENT_LOOP_LAG.observe(max(time.perf_counter() - expected, 0.0))
+            self._sample()
+
+    def _sample(self) -> None:
+        default = anyio.to_thread.current_default_thread_limiter()
+        for pool, limiter in (("default", default), ("reserved", _reserved)):
+            if limiter is None:
+                continue
+            stats = limiter.statistics()
+            THREADPOOL_BUSY.labels(pool=pool).set(stats.borrowed_tokens)
+            THREADPOOL_WAITING.labels(pool=pool).set(stats.tasks_waiting)
+
+        stats = default.statistics()
+        now = time.monotonic()
+        if stats.borrowed_tokens < stats.total_tokens or not stats.tasks_waiting:
+            if self._warned:
+                logger.info("threadpool no longer saturated after %.1fs", now - self._saturated_since)
+            self._saturated_since, self._warned = None, False
+            return
+        if self._saturated_since is None:
+            self._saturated_since = now
+        elif not self._warned and now - self._saturated_since >= settings.threadpool_saturation_warn_seconds:
+            self._warned = True
+            logger.warning(
+                "threadpool saturated for %.1fs: %d/%d threads busy, %d tasks waiting; "
+                "consider raising THREADPOOL_SIZE",
+                now - self._saturated_since,
+                stats.borrowed_tokens,
+                stats.total_tokens,
+                stats.tasks_waiting,
+            )
+
+
+loop_monitor = LoopMonitor()
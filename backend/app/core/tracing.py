@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger("app.tracing")
+
+_otel_tracer: Any = None
+_otel_lock = threading.Lock()
+
+
+def setup_tracing() -> None:
+    """Configure the optional OpenTelemetry exporter; tracing stays local (no-op export) when
+    `OTEL_ENABLED` is off or the SDK/exporter packages are not installed."""
+    global _otel_tracer
+    if not settings.otel_enabled or _otel_tracer is not None:
+        return
+    with _otel_lock:
+        if _otel_tracer is not None:
+            return
+        try:
+            from opentelemetry import trace
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except Exception as exc:  # pragma: no cover - optional dependency
+            logger.warning("OTEL_ENABLED is set but OpenTelemetry is not installed (%s); spans stay local", exc)
+            return
+        provider = TracerProvider(resource=Resource.create({"service.name": settings.otel_service_name}))
+        exporter = OTLPSpanExporter(endpoint=settings.otel_endpoint) if settings.otel_endpoint else OTLPSpanExporter()
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        _otel_tracer = trace.get_tracer("app")
+
+
+class RequestTrace:
+    """Phase timings for one request.
+
+    Spans are flat (name, start, duration) records; a phase may cover others (e.g.
+    `prompt_build` includes `history` and `rag_*`). They are rendered as a Server-Timing
+    header or a dict for the SSE `meta` event, and exported to OpenTelemetry when enabled.
+    """
+
+    def __init__(self, name: str = "request") -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self._started_ns = time.time_ns()
+        self._spans: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter() - start)
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        """Record a phase that started at perf_counter() time `start`."""
+        with self._lock:
+            self._spans.append((name, start, duration))
+
+    @property
+    def spans(self) -> List[Tuple[str, float, float]]:
+        with self._lock:
+            return list(self._spans)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Milliseconds per phase; repeated phases are summed."""
+        timings: Dict[str, float] = {}
+        for name, _, duration in self.spans:
+            timings[name] = round(timings.get(name, 0.0) + duration * 1000, 2)
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return timings
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
+
+    def export(self) -> None:
+        """Send the spans to OpenTelemetry as children of one request span (no-op when disabled)."""
+        tracer = _otel_tracer
+        if tracer is None:
+            return
+        from opentelemetry import trace
+
+        end_ns = self._started_ns + int((time.perf_counter() - self.started) * 1e9)
+        root = tracer.start_span(self.name, start_time=self._started_ns)
+        context = trace.set_span_in_context(root)
+        for name, start, duration in self.spans:
+            start_ns = self._started_ns + int((start - self.started) * 1e9)
+            child = tracer.start_span(name, context=context, start_time=start_ns)
+            child.end(end_time=start_ns + int(duration * 1e9))
+        root.end(end_time=end_ns)
+
+
+class _NoopTrace(RequestTrace):
+    """Stand-in used outside a request, e.g. batch jobs and background work."""
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        return None
+
+
+_NOOP = _NoopTrace()
+_current: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("request_trace", default=None)
+
+
+def start_trace(name: str = "request") -> RequestTrace:
+    trace = RequestTrace(name)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> RequestTrace:
+    return _current.get() or _NOOP
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
 import logging
-import time
-from typing import Callable
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from starlette.responses import Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 from app.api.files_routes import router as files_router
 from app.api.agents_routes import router as agents_router
 from app.api.chats_routes import router as chats_router
+from app.core.auth import require_admin
+from app.core.compression import CompressionMiddleware
+from app.core.http_metrics import RequestMetricsMiddleware
+from app.core.profiling import ProfilerBusy, cpu_profiler, memory_profiler
+from app.core.serialization import FastJSONResponse
 from app.core.settings import settings
+from app.core.threadpool import configure_threadpool, loop_monitor, run_reserved
+from app.core.tracing import setup_tracing
+from app.services.admission import AdmissionRejected
+from app.services.llm_base import ProviderError
+from app.services.ollama_residency import residency
+from app.services.orchestrator import orchestrator
 
 
 def create_app() -> FastAPI:
@@ -22,6 +31,7 @@ def create_app() -> FastAPI:
         docs_url="/api/docs",
         redoc_url="/api/redoc",
         openapi_url="/api/openapi.json",
+        default_response_class=FastJSONResponse,
     )
 
     # Configure structured logging
@@ -29,7 +39,6 @@ def create_app() -> FastAPI:
         level=logging.INFO,
         format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
     )
-    logger = logging.getLogger("app")
 
     allowed_origins = [origin.strip() for origin in settings.allowed_origins.split(",") if origin.strip()]
     # Ensure backend origin itself is allowed so Swagger "Try it out" works
@@ -47,41 +56,84 @@ def create_app() -> FastAPI:
         max_age=600,
     )
 
-    # Prometheus metrics
-    REQUEST_COUNT = Counter(
-        "http_requests_total",
-        "Total HTTP requests",
-        ["method", "path", "status"],
-    )
-    REQUEST_LATENCY = Histogram(
-        "http_request_duration_seconds",
-        "HTTP request latency",
-        ["method", "path"],
-    )
+    application.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes)
 
-    @application.middleware("http")
-    async def logging_and_metrics_middleware(request: Request, call_next: Callable):
-        start_time = time.perf_counter()
-        response: Response
-        try:
-            response = await call_next(request)
-        finally:
-            duration = time.perf_counter() - start_time
-            path = request.url.path
-            method = request.method
-            status = getattr(response, "status_code", 500)
-            REQUEST_COUNT.labels(method=method, path=path, status=str(status)).inc()
-            REQUEST_LATENCY.labels(method=method, path=path).observe(duration)
-            logger.info(f"{method} {path} -> {status} in {duration:.3f}s")
-        return response
+    # Outermost, so it also sees responses produced by CORS and the exception handlers
+    application.add_middleware(RequestMetricsMiddleware)
+
+    @application.exception_handler(AdmissionRejected)
+    async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+        # 429 when the provider queue is full, 503 when the queued wait ran out
+        return JSONResponse(
+            {"detail": str(exc), "provider": exc.provider},
+            status_code=exc.status_code,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @application.exception_handler(ProviderError)
+    async def provider_error_handler(request: Request, exc: ProviderError) -> JSONResponse:
+        # A provider that cannot be built (missing package or API key) or failed before streaming
+        return JSONResponse({"detail": str(exc)}, status_code=503)
+
+    @application.on_event("startup")
+    async def start_threadpool_monitoring() -> None:
+        configure_threadpool()
+        loop_monitor.start()
+
+    @application.on_event("shutdown")
+    async def stop_threadpool_monitoring() -> None:
+        await loop_monitor.stop()
+
+    @application.on_event("startup")
+    def start_tracing() -> None:
+        setup_tracing()
 
+    @application.on_event("startup")
+    def start_ollama_residency() -> None:
+        # Warm configured local models in the background; startup does not wait on Ollama
+        if settings.ollama_warm_models:
+            residency.start(lambda: orchestrator.provider("ollama").client)
+
+    # Health and metrics must not wait behind a saturated threadpool: health runs on the
+    # event loop and metrics rendering uses the reserved threads
     @application.get("/health")
-    def health_check() -> dict:
+    async def health_check() -> dict:
         return {"status": "ok"}
 
     @application.get("/metrics")
-    def metrics() -> Response:
-        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    async def metrics() -> Response:
+        return Response(await run_reserved(generate_latest), media_type=CONTENT_TYPE_LATEST)
+
+    @application.get("/debug/profile/cpu", dependencies=[Depends(require_admin)], include_in_schema=False)
+    async def profile_cpu(
+        seconds: float = Query(10.0, gt=0, le=120),
+        interval_ms: float = Query(10.0, ge=1, le=1000),
+    ) -> PlainTextResponse:
+        """Sample all threads for `seconds`; returns collapsed stacks for flamegraph tools."""
+        try:
+            collapsed = await run_reserved(cpu_profiler.sample, seconds, interval_ms / 1000)
+        except ProfilerBusy as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+        return PlainTextResponse(collapsed)
+
+    @application.post("/debug/memory/start", dependencies=[Depends(require_admin)], include_in_schema=False)
+    async def memory_start(frames: int = Query(1, ge=1, le=64)) -> dict:
+        """Start tracemalloc (if needed) and take the baseline snapshot."""
+        await run_reserved(memory_profiler.start, frames)
+        return {"tracing": True}
+
+    @application.get("/debug/memory/diff", dependencies=[Depends(require_admin)], include_in_schema=False)
+    async def memory_diff(top: int = Query(25, ge=1, le=500), reset: bool = Query(False)) -> dict:
+        """Allocation growth by module since the baseline (`reset` moves the baseline forward)."""
+        try:
+            return await run_reserved(lambda: memory_profiler.diff(top=top, reset=reset))
+        except RuntimeError as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+
+    @application.post("/debug/memory/stop", dependencies=[Depends(require_admin)], include_in_schema=False)
+    async def memory_stop() -> dict:
+        await run_reserved(memory_profiler.stop)
+        return {"tracing": False}
 
     application.include_router(files_router)
     application.include_router(agents_router)
@@ -3,21 +3,50 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, ForeignKey, Index
+from sqlalchemy import DDL, Connection, LargeBinary, String, Text, ForeignKey, Index, event, func, literal_column, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
 
 
+# Text search configuration used by both the GIN index and search queries. It is a
+# literal (not a bind parameter) so the planner can match the indexed expression.
+FTS_CONFIG = literal_column("'english'::regconfig")
+
+
 class Chat(Base):
     __tablename__ = "chats"
+    # Sidebar query: WHERE session_id = ? ORDER BY last_message_at DESC, id DESC, answered from the index
+    __table_args__ = (
+        Index(
+            "ix_chats_session_last_message",
+            "session_id",
+            "last_message_at",
+            "id",
+            postgresql_include=["title", "message_count"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(String(100), index=True)
     title: Mapped[str] = mapped_column(String(200))
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    # Change marker for conditional GETs; bumped on title edits and message inserts
+    updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized activity, maintained alongside every message insert
+    message_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_message_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    # Rolling summary of every message up to and including summary_upto_id
+    summary: Mapped[Optional[str]] = mapped_column(Text(), nullable=True)
+    summary_upto_id: Mapped[int] = mapped_column(default=0, server_default="0")
+    summary_source_chars: Mapped[int] = mapped_column(default=0, server_default="0")
+    summary_updated_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    # Set while the chat's messages live compressed in chat_archives instead of messages
+    archived_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
-    messages: Mapped[list[Message]] = relationship("Message", back_populates="chat", cascade="all, delete-orphan")
+    messages: Mapped[list[Message]] = relationship(
+        "Message", back_populates="chat", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class Message(Base):
@@ -31,3 +60,58 @@ class Message(Base):
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, index=True)
 
     chat: Mapped[Chat] = relationship("Chat", back_populates="messages")
+
+
+class ChatArchive(Base):
+    """Cold storage for an idle chat: its messages as one compressed blob."""
+
+    __tablename__ = "chat_archives"
+
+    chat_id: Mapped[int] = mapped_column(ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary())
+    message_count: Mapped[int] = mapped_column()
+    raw_bytes: Mapped[int] = mapped_column()
+    compressed_bytes: Mapped[int] = mapped_column()
+    archived_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+
+
+# Full-text index over message content. Postgres indexes the tsvector expression
+# directly; SQLite keeps an external-content FTS5 table in sync via triggers. Both
+# update incrementally on every insert/delete.
+Index(
+    "ix_messages_content_fts",
+    func.to_tsvector(FTS_CONFIG, Message.content),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content); END",
+)
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(Message.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def ensure_sqlite_fts(connection: Connection) -> None:
+    """Create the FTS5 table and triggers on a SQLite database that predates them.
+
+    `after_create` only fires for a new messages table. When the FTS table is missing,
+    it is created here and filled from the existing messages. Idempotent; a no-op on
+    other dialects.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+    ).first()
+    for statement in SQLITE_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if exists is None:
+        connection.exec_driver_sql("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
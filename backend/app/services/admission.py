@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple, Union
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.settings import parse_provider_map, settings
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+
+    INTERACTIVE = 0  # streaming chat turns a user is watching
+    NON_STREAMING = 1  # one-shot /message calls
+    BATCH = 2  # batch jobs and background work (summaries)
+
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "llm_admission_in_flight",
+    "Generations currently holding a provider slot",
+    ["provider", "model"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "llm_admission_queue_depth",
+    "Requests waiting for a provider slot",
+    ["provider", "model"],
+)
+ADMISSION_WAIT = Histogram(
+    "llm_admission_wait_seconds",
+    "Time spent queued before a provider slot was granted",
+    ["provider", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+ADMISSION_REJECTED = Counter(
+    "llm_admission_rejected_total",
+    "Requests shed by admission control",
+    ["provider", "priority", "reason"],  # queue_full | timeout
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a provider queue is full (429) or the wait exceeded its budget (503)."""
+
+    def __init__(self, provider: str, status_code: int, retry_after: int, reason: str) -> None:
+        super().__init__(f"{provider} is overloaded ({reason}); retry after {retry_after}s")
+        self.provider = provider
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class Slot:
+    """A granted provider slot. Release is idempotent."""
+
+    def __init__(self, limiter: ProviderLimiter) -> None:
+        self._limiter = limiter
+        self._granted_at = time.monotonic()
+        self._released = False
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._limiter._release(time.monotonic() - self._granted_at)
+
+
+class _Waiter:
+    """A queued request: a thread blocked on an event, or a task awaiting a future.
+
+    `grant` runs under the limiter lock on whichever thread released the slot, so an
+    async waiter is woken through its loop.
+    """
+
+    __slots__ = ("granted", "event", "future", "_loop")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.granted = False
+        self._loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def grant(self) -> None:
+        self.granted = True
+        if self._loop is None:
+            self.event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class ProviderLimiter:
+    """Concurrency limit for one provider/model with a bounded priority wait queue."""
+
+    def __init__(self, provider: str, model: str, limit: int, max_queue: int) -> None:
+        self.provider = provider
+        self.model = model
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self._active = 0
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        # Smoothed slot hold time, used to estimate Retry-After
+        self._avg_hold = 5.0
+
+    def _queue_capacity(self, priority: Priority) -> int:
+        # Lower priorities get a shallower queue so they are shed first under load
+        return self.max_queue if priority == Priority.INTERACTIVE else self.max_queue // 2
+
+    def _retry_after(self) -> int:
+        backlog = len(self._waiters) + self._active
+        return max(1, math.ceil(self._avg_hold * backlog / self.limit))
+
+    def acquire(self, priority: Priority, timeout: float) -> Slot:
+        """Take a slot, blocking the calling thread while queued."""
+        start = time.monotonic()
+        entry = self._try_acquire(priority)
+        if isinstance(entry, Slot):
+            return entry
+        entry[2].event.wait(timeout)
+        return self._settle(entry, priority, start)
+
+    async def acquire_async(self, priority: Priority, timeout: float) -> Slot:
+        """Take a slot, queueing on the event loop so a waiting request holds no worker thread."""
+        start = time.monotonic()
+        entry = self._try_acquire(priority, asyncio.get_running_loop())
+        if isinstance(entry, Slot):
+            return entry
+        try:
+            await asyncio.wait({entry[2].future}, timeout=timeout)
+        except BaseException:
+            # Cancelled while queued: leave the queue, or pass on a slot granted meanwhile
+            self._abandon(entry)
+            raise
+        return self._settle(entry, priority, start)
+
+    def _try_acquire(
+        self, priority: Priority, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Union[Slot, Tuple[int, int, _Waiter]]:
+        """A slot when one is free, otherwise the queue entry to wait on."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self._update_gauges()
+                ADMISSION_WAIT.labels(provider=self.provider, priority=priority.name.lower()).observe(0.0)
+                return Slot(self)
+            if len(self._waiters) >= self._queue_capacity(priority):
+                ADMISSION_REJECTED.labels(provider=self.provider, priority=priority.name.lower(), reason="queue_full").inc()
+                raise AdmissionRejected(self.provider, 429, self._retry_after(), "queue full")
+            entry = (int(priority), next(self._seq), _Waiter(loop))
+            heapq.heappush(self._waiters, entry)
+            self._update_gauges()
+        return entry
+
+    def _settle(self, entry: Tuple[int, int, _Waiter], priority: Priority, start: float) -> Slot:
+        labels = {"provider": self.provider, "priority": priority.name.lower()}
+        with self._lock:
+            if not entry[2].granted:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._update_gauges()
+                ADMISSION_REJECTED.labels(reason="timeout", **labels).inc()
+                raise AdmissionRejected(self.provider, 503, self._retry_after(), "queue wait timed out")
+        ADMISSION_WAIT.labels(**labels).observe(time.monotonic() - start)
+        return Slot(self)
+
+    def _abandon(self, entry: Tuple[int, int, _Waiter]) -> None:
+        with self._lock:
+            granted = entry[2].granted
+            if not granted:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._update_gauges()
+        if granted:
+            self._release(0.0)
+
+    def _release(self, held: float) -> None:
+        with self._lock:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+            if self._waiters:
+                # Hand the slot straight to the highest-priority waiter; _active is unchanged
+                _, _, waiter = heapq.heappop(self._waiters)
+                waiter.grant()
+            else:
+                self._active -= 1
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.labels(provider=self.provider, model=self.model).set(self._active)
+        ADMISSION_QUEUE_DEPTH.labels(provider=self.provider, model=self.model).set(len(self._waiters))
+
+
+class AdmissionController:
+    """Per provider+model limiters, configured from settings.
+
+    `ADMISSION_LIMITS` accepts "provider=N" or "provider:model=N" entries; the most
+    specific entry wins, then `ADMISSION_DEFAULT_LIMIT`.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, provider: str, model: str) -> int:
+        limits = parse_provider_map(settings.admission_limits)
+        value = limits.get(f"{provider}:{model}", limits.get(provider, settings.admission_default_limit))
+        return int(value)
+
+    def limiter(self, provider: str, model: Optional[str]) -> ProviderLimiter:
+        key = (provider, model or "default")
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(key)
+                if limiter is None:
+                    limiter = ProviderLimiter(
+                        provider,
+                        key[1],
+                        self._limit_for(*key),
+                        settings.admission_max_queue,
+                    )
+                    self._limiters[key] = limiter
+        return limiter
+
+    def acquire(self, provider: str, model: Optional[str], priority: Priority = Priority.INTERACTIVE) -> Slot:
+        return self.limiter(provider, model).acquire(priority, settings.admission_max_wait_seconds)
+
+    async def acquire_async(
+        self, provider: str, model: Optional[str], priority: Priority = Priority.INTERACTIVE
+    ) -> Slot:
+        return await self.limiter(provider, model).acquire_async(priority, settings.admission_max_wait_seconds)
+
+
+admission = AdmissionController()
@@ -0,0 +1,184 @@
+"""Move idle chats into compressed cold storage and bring them back on demand.
+
+Run once from backend/:
+    python -m app.services.archiver --idle-days 30
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.core.settings import settings
+from app.models import Chat, ChatArchive, Message
+
+
+logger = logging.getLogger("app.archiver")
+
+ARCHIVED_CHATS = Counter("chat_archive_chats_total", "Chats moved to cold storage")
+ARCHIVED_ROWS = Counter("chat_archive_rows_moved_total", "Message rows moved out of the hot messages table")
+ARCHIVE_BYTES_SAVED = Counter(
+    "chat_archive_bytes_saved_total",
+    "Message bytes saved by compression (raw minus compressed)",
+)
+REHYDRATE_SECONDS = Histogram(
+    "chat_archive_rehydrate_seconds",
+    "Latency of reading or restoring an archived chat",
+    ["mode"],  # restore: move back into messages
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+ARCHIVE_BATCH_SIZE = 100
+
+
+def encode_messages(rows: List[Any]) -> bytes:
+    """Serialize (id, role, content, created_at) rows; the blob is compressed separately."""
+    return json.dumps(
+        [[r.id, r.role, r.content, r.created_at.isoformat()] for r in rows],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def decode_messages(chat_id: int, payload: bytes) -> List[Dict[str, Any]]:
+    """Inflate an archive blob into message dicts ordered by (created_at, id)."""
+    return [
+        {
+            "id": msg_id,
+            "chat_id": chat_id,
+            "role": role,
+            "content": content,
+            "created_at": datetime.fromisoformat(created_at),
+        }
+        for msg_id, role, content, created_at in json.loads(zlib.decompress(payload))
+    ]
+
+
+def restore_archived(chat_id: int) -> int:
+    """`rehydrate` in its own session, for callers without one (e.g. on a worker thread)."""
+    with SessionLocal() as db:
+        return rehydrate(db, chat_id)
+
+
+def _archive_chat(db: Session, chat_id: int, cutoff: datetime) -> Optional[Dict[str, int]]:
+    # Claim the chat first; the row lock serializes against concurrent message inserts
+    claimed = db.execute(
+        update(Chat)
+        .where(Chat.id == chat_id, Chat.archived_at.is_(None), Chat.last_message_at < cutoff)
+        .values(archived_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+    rows = db.execute(
+        select(Message.id, Message.role, Message.content, Message.created_at)
+        .where(Message.chat_id == chat_id)
+        .order_by(Message.created_at.asc(), Message.id.asc())
+    ).all()
+    if not rows:
+        db.rollback()
+        return None
+    raw = encode_messages(rows)
+    payload = zlib.compress(raw, 9)
+    db.add(ChatArchive(
+        chat_id=chat_id,
+        payload=payload,
+        message_count=len(rows),
+        raw_bytes=len(raw),
+        compressed_bytes=len(payload),
+    ))
+    db.execute(delete(Message).where(Message.id.in_([r.id for r in rows])))
+    db.commit()
+    return {"rows": len(rows), "raw_bytes": len(raw), "compressed_bytes": len(payload)}
+
+
+def archive_idle_chats(idle_days: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Archive every chat idle for longer than `idle_days`, one transaction per chat."""
+    days = settings.archive_idle_days if idle_days is None else idle_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    report: Dict[str, Any] = {"chats": 0, "rows_moved": 0, "raw_bytes": 0, "compressed_bytes": 0}
+    start = time.perf_counter()
+    last_id = 0
+    while limit is None or report["chats"] < limit:
+        with SessionLocal() as db:
+            candidates = list(
+                db.scalars(
+                    select(Chat.id)
+                    .where(
+                        Chat.id > last_id,
+                        Chat.archived_at.is_(None),
+                        Chat.last_message_at < cutoff,
+                        Chat.message_count > 0,
+                    )
+                    .order_by(Chat.id)
+                    .limit(ARCHIVE_BATCH_SIZE)
+                )
+            )
+            if not candidates:
+                break
+            for chat_id in candidates:
+                last_id = chat_id
+                moved = _archive_chat(db, chat_id, cutoff)
+                if moved is None:
+                    continue
+                report["chats"] += 1
+                report["rows_moved"] += moved["rows"]
+                report["raw_bytes"] += moved["raw_bytes"]
+                report["compressed_bytes"] += moved["compressed_bytes"]
+                ARCHIVED_CHATS.inc()
+                ARCHIVED_ROWS.inc(moved["rows"])
+                ARCHIVE_BYTES_SAVED.inc(moved["raw_bytes"] - moved["compressed_bytes"])
+                if limit is not None and report["chats"] >= limit:
+                    break
+    report["bytes_saved"] = report["raw_bytes"] - report["compressed_bytes"]
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(
+        "archived %s chats: %s rows moved, %s bytes saved in %.3fs",
+        report["chats"], report["rows_moved"], report["bytes_saved"], report["seconds"],
+    )
+    return report
+
+
+def rehydrate(db: Session, chat_id: int) -> int:
+    """Move an archived chat's messages back into the hot table. Returns rows restored."""
+    start = time.perf_counter()
+    # Unclaim first; a concurrent rehydration blocks on the row lock and then sees nothing to do
+    claimed = db.execute(
+        update(Chat).where(Chat.id == chat_id, Chat.archived_at.is_not(None)).values(archived_at=None)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return 0
+    archive = db.get(ChatArchive, chat_id)
+    restored = 0
+    if archive is not None:
+        messages = decode_messages(chat_id, archive.payload)
+        if messages:
+            db.execute(insert(Message), messages)
+        restored = len(messages)
+        db.delete(archive)
+    db.commit()
+    REHYDRATE_SECONDS.labels(mode="restore").observe(time.perf_counter() - start)
+    return restored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle-days", type=int, default=None, help="defaults to ARCHIVE_IDLE_DAYS")
+    parser.add_argument("--limit", type=int, default=None, help="archive at most this many chats")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    print(json.dumps(archive_idle_chats(args.idle_days, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
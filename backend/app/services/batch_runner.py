@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.settings import parse_provider_map, settings
+from app.services.admission import AdmissionRejected, Priority
+from app.services.orchestrator import AdmissionTicket, orchestrator
+
+
+@dataclass
+class BatchItem:
+    prompt: str
+    id: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    temperature: float = 0.3
+    chat_id: Optional[int] = None
+
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second, bursting up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self._rate = rate
+        self._capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+# Rate limits are per process, shared by every batch
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def _rate_limiter(provider: str) -> Optional[RateLimiter]:
+    limiter = _rate_limiters.get(provider)
+    if limiter is None:
+        rate = parse_provider_map(settings.provider_rate_limits).get(provider)
+        if not rate or rate <= 0:
+            return None
+        limiter = _rate_limiters.setdefault(provider, RateLimiter(rate))
+    return limiter
+
+
+def _concurrency(provider: str, requested: Optional[Dict[str, int]]) -> int:
+    ceiling = int(parse_provider_map(settings.batch_concurrency_overrides).get(provider, settings.batch_max_concurrency))
+    wanted = (requested or {}).get(provider, ceiling)
+    return max(1, min(int(wanted), ceiling))
+
+
+def _generate(item: BatchItem, session_id: str, ticket: AdmissionTicket) -> tuple[str, Optional[int]]:
+    completion = orchestrator.complete(
+        session_id=session_id,
+        prompt=item.prompt,
+        chat_id=item.chat_id,
+        temperature=item.temperature,
+        priority=Priority.BATCH,
+        ticket=ticket,
+    )
+    return completion.text, completion.chat_id
+
+
+async def run_batch(
+    items: List[BatchItem],
+    *,
+    session_id: str,
+    concurrency: Optional[Dict[str, int]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run prompts with bounded parallelism per provider, yielding results in completion order.
+
+    Each item is isolated: any exception becomes an `ok: false` result and the
+    rest of the batch carries on. A final summary record follows the last result.
+    """
+    batch_start = time.perf_counter()
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def run_one(index: int, item: BatchItem) -> Dict[str, Any]:
+        provider_key, model_name = orchestrator.resolve_provider(session_id, item.provider, item.model)
+        semaphore = semaphores.setdefault(provider_key, asyncio.Semaphore(_concurrency(provider_key, concurrency)))
+        result: Dict[str, Any] = {
+            "type": "result",
+            "index": index,
+            "id": item.id,
+            "provider": provider_key,
+            "model": model_name,
+        }
+        queued = time.perf_counter()
+        async with semaphore:
+            limiter = _rate_limiter(provider_key)
+            if limiter is not None:
+                await limiter.acquire()
+            started = time.perf_counter()
+            result["queued_ms"] = round((started - queued) * 1000, 1)
+            try:
+                # Wait for the provider slot here rather than on a thread
+                ticket = await orchestrator.admit(
+                    session_id=session_id, provider=item.provider, model=item.model, priority=Priority.BATCH
+                )
+                try:
+                    text, chat_id = await asyncio.to_thread(_generate, item, session_id, ticket)
+                finally:
+                    ticket.release()
+            except AdmissionRejected as exc:
+                result.update(ok=False, error=str(exc), retry_after=exc.retry_after)
+            except Exception as exc:  # noqa: BLE001 - isolate failures per item
+                result.update(ok=False, error=str(exc))
+            else:
+                result.update(ok=True, chat_id=chat_id, text=text)
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    tasks = [asyncio.create_task(run_one(i, item)) for i, item in enumerate(items)]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            failed += 0 if result["ok"] else 1
+            yield result
+    finally:
+        # Client went away or the batch was aborted: drop whatever has not started yet
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "summary",
+        "total": len(items),
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - batch_start) * 1000, 1),
+    }
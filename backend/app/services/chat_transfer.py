@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Set
+
+from sqlalchemy import insert, select
+
+from app.core.db import AsyncSessionLocal
+from app.models import Chat, ChatArchive, Message
+from app.services.archiver import decode_messages
+
+
+# Rows fetched per server-side cursor round trip, and rows per bulk INSERT on import
+EXPORT_BATCH_SIZE = 2000
+IMPORT_BATCH_SIZE = 2000
+
+_CHAT_COLUMNS = (
+    Chat.id,
+    Chat.session_id,
+    Chat.title,
+    Chat.created_at,
+    Chat.updated_at,
+    Chat.message_count,
+    Chat.last_message_at,
+)
+_MESSAGE_COLUMNS = (Message.id, Message.chat_id, Message.role, Message.content, Message.created_at)
+
+
+def _encode_record(kind: str, fields: Mapping[str, Any]) -> str:
+    record: Dict[str, Any] = {"type": kind}
+    for key, value in fields.items():
+        record[key] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _archived_records(chat_id: int, payload: bytes) -> List[str]:
+    return [_encode_record("message", m) for m in decode_messages(chat_id, payload)]
+
+
+async def export_ndjson(session_id: Optional[str] = None, compress: bool = False) -> AsyncIterator[bytes]:
+    """Stream every chat, then every message, as NDJSON in constant memory.
+
+    Rows come from server-side cursors (`yield_per`) over plain columns, so no ORM
+    objects accumulate. Chats are written first so an import can map ids in one pass;
+    archived chats' messages follow the hot ones.
+    """
+    gzip = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(lines: List[str]) -> bytes:
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        return gzip.compress(data) if gzip is not None else data
+
+    chats_stmt = select(*_CHAT_COLUMNS).order_by(Chat.id)
+    messages_stmt = select(*_MESSAGE_COLUMNS).order_by(Message.chat_id, Message.id)
+    if session_id is not None:
+        chats_stmt = chats_stmt.where(Chat.session_id == session_id)
+        messages_stmt = messages_stmt.join(Chat, Chat.id == Message.chat_id).where(Chat.session_id == session_id)
+
+    archives_stmt = select(ChatArchive.chat_id, ChatArchive.payload).order_by(ChatArchive.chat_id)
+    if session_id is not None:
+        archives_stmt = archives_stmt.join(Chat, Chat.id == ChatArchive.chat_id).where(Chat.session_id == session_id)
+
+    async with AsyncSessionLocal() as db:
+        for kind, stmt in (("chat", chats_stmt), ("message", messages_stmt)):
+            result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for partition in result.partitions():
+                chunk = emit([_encode_record(kind, row._mapping) for row in partition])
+                if chunk:
+                    yield chunk
+        # Messages of archived chats live in compressed blobs; inflate one chat at a time,
+        # on a worker thread so a large archive does not stall the event loop
+        result = await db.stream(archives_stmt.execution_options(yield_per=1))
+        async for chat_id, payload in result:
+            lines = await asyncio.to_thread(_archived_records, chat_id, payload)
+            if lines:
+                yield emit(lines)
+
+    if gzip is not None:
+        yield gzip.flush()
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], compressed: bool) -> AsyncIterator[bytes]:
+    gunzip = zlib.decompressobj(wbits=47) if compressed else None  # 47: auto-detect gzip/zlib header
+    buffer = b""
+    async for chunk in chunks:
+        if gunzip is not None:
+            chunk = gunzip.decompress(chunk)
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if gunzip is not None:
+        buffer += gunzip.flush()
+    if buffer.strip():
+        yield buffer
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+async def import_ndjson(
+    chunks: AsyncIterator[bytes],
+    *,
+    compressed: bool = False,
+    session_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """Ingest an NDJSON export with batched bulk INSERTs.
+
+    Chats get fresh ids; messages are remapped via the exported chat id. Memory stays
+    bounded by the batch size plus the id map. The whole import is one transaction: a
+    malformed record rolls back everything written so far, so a failed import can simply
+    be retried. Messages whose chat is not in the stream are counted as skipped.
+    """
+    stats = {"chats": 0, "messages": 0, "skipped": 0}
+    chat_ids: Dict[int, int] = {}
+    pending_chats: List[Dict[str, Any]] = []
+    pending_chat_ids: List[int] = []
+    pending_chat_id_set: Set[int] = set()
+    pending_messages: List[Dict[str, Any]] = []
+
+    async with AsyncSessionLocal() as db:
+
+        async def flush_chats() -> None:
+            if not pending_chats:
+                return
+            new_ids = await db.scalars(
+                insert(Chat).returning(Chat.id, sort_by_parameter_order=True),
+                pending_chats,
+            )
+            chat_ids.update(zip(pending_chat_ids, new_ids))
+            stats["chats"] += len(pending_chats)
+            pending_chats.clear()
+            pending_chat_ids.clear()
+            pending_chat_id_set.clear()
+
+        async def flush_messages() -> None:
+            if not pending_messages:
+                return
+            await db.execute(insert(Message), pending_messages)
+            stats["messages"] += len(pending_messages)
+            pending_messages.clear()
+
+        async for line in _iter_lines(chunks, compressed):
+            record = json.loads(line)
+            kind = record.get("type")
+            if kind == "chat":
+                created_at = _parse_dt(record.get("created_at")) or datetime.utcnow()
+                pending_chat_ids.append(int(record["id"]))
+                pending_chat_id_set.add(pending_chat_ids[-1])
+                pending_chats.append({
+                    "session_id": session_id or record["session_id"],
+                    "title": record.get("title") or "New chat",
+                    "created_at": created_at,
+                    "updated_at": _parse_dt(record.get("updated_at")) or created_at,
+                    "message_count": int(record.get("message_count") or 0),
+                    "last_message_at": _parse_dt(record.get("last_message_at")) or created_at,
+                })
+                if len(pending_chats) >= IMPORT_BATCH_SIZE:
+                    await flush_chats()
+            elif kind == "message":
+                old_chat_id = int(record["chat_id"])
+                if old_chat_id not in chat_ids and old_chat_id in pending_chat_id_set:
+                    await flush_chats()
+                new_chat_id = chat_ids.get(old_chat_id)
+                if new_chat_id is None:
+                    stats["skipped"] += 1
+                    continue
+                pending_messages.append({
+                    "chat_id": new_chat_id,
+                    "role": record["role"],
+                    "content": record["content"],
+                    "created_at": _parse_dt(record.get("created_at")) or datetime.utcnow(),
+                })
+                if len(pending_messages) >= IMPORT_BATCH_SIZE:
+                    await flush_messages()
+            else:
+                stats["skipped"] += 1
+
+        await flush_chats()
+        await flush_messages()
+        # Leaving the session without this commit (any exception above) rolls back
+        await db.commit()
+    return stats
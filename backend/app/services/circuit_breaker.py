@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge
+
+from app.core.settings import settings
+
+
+logger = logging.getLogger("app.circuit")
+
+
+class BreakerState(Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+BREAKER_STATE = Gauge(
+    "llm_circuit_state",
+    "Circuit breaker state per provider (0=closed, 1=half-open, 2=open)",
+    ["provider"],
+)
+BREAKER_TRANSITIONS = Counter(
+    "llm_circuit_transitions_total",
+    "Circuit breaker state changes",
+    ["provider", "state"],
+)
+BREAKER_SHORT_CIRCUITS = Counter(
+    "llm_circuit_short_circuits_total",
+    "Requests skipped because the provider's breaker was open",
+    ["provider"],
+)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one provider.
+
+    A call counts as a failure when it raises or when its time to first chunk exceeds
+    `circuit_slow_call_seconds`. After `circuit_failure_threshold` consecutive
+    failures the breaker opens and rejects immediately. Once `circuit_reset_seconds`
+    have passed, or a background health probe succeeds, it goes half-open and lets a
+    single trial call through; that call's outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, health_check: Optional[Callable[[], object]] = None) -> None:
+        self.name = name
+        self.health_check = health_check
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        BREAKER_STATE.labels(provider=name).set(self._state.value)
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    def retry_after(self) -> int:
+        remaining = self._opened_at + settings.circuit_reset_seconds - time.monotonic()
+        return max(1, int(remaining + 0.999))
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state is BreakerState.OPEN:
+                if time.monotonic() - self._opened_at < settings.circuit_reset_seconds:
+                    BREAKER_SHORT_CIRCUITS.labels(provider=self.name).inc()
+                    return False
+                self._transition(BreakerState.HALF_OPEN)
+            if self._state is BreakerState.HALF_OPEN:
+                if self._trial_in_flight:
+                    BREAKER_SHORT_CIRCUITS.labels(provider=self.name).inc()
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self, first_chunk_seconds: Optional[float] = None) -> None:
+        # Non-streaming calls have no first chunk, so they are not judged against the slow-call threshold
+        if first_chunk_seconds is not None and first_chunk_seconds > settings.circuit_slow_call_seconds:
+            self.record_failure(reason="slow")
+            return
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state is not BreakerState.CLOSED:
+                self._transition(BreakerState.CLOSED)
+
+    def record_failure(self, reason: str = "error") -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state is BreakerState.HALF_OPEN or (
+                self._state is BreakerState.CLOSED and self._failures >= settings.circuit_failure_threshold
+            ):
+                logger.warning("opening circuit for %s after %s failure(s) (%s)", self.name, self._failures, reason)
+                self._opened_at = time.monotonic()
+                self._transition(BreakerState.OPEN)
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that ended without a verdict (e.g. client disconnect)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def probe(self) -> None:
+        """Run the health check for an open breaker; success lets the next call through as a trial."""
+        if self.health_check is None or self._state is not BreakerState.OPEN:
+            return
+        try:
+            self.health_check()
+        except Exception as exc:  # noqa: BLE001 - a failed probe just keeps the breaker open
+            logger.debug("health probe for %s failed: %s", self.name, exc)
+            return
+        with self._lock:
+            if self._state is BreakerState.OPEN:
+                self._transition(BreakerState.HALF_OPEN)
+
+    def _transition(self, state: BreakerState) -> None:
+        self._state = state
+        BREAKER_STATE.labels(provider=self.name).set(state.value)
+        BREAKER_TRANSITIONS.labels(provider=self.name, state=state.name.lower()).inc()
+
+
+class BreakerRegistry:
+    """One breaker per provider, plus a daemon thread that probes open breakers."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+
+    def get(self, name: str, health_check: Optional[Callable[[], object]] = None) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, health_check))
+                self._ensure_prober()
+        return breaker
+
+    def _ensure_prober(self) -> None:
+        if self._prober is None and settings.circuit_probe_interval_seconds > 0:
+            self._prober = threading.Thread(target=self._probe_loop, name="circuit-prober", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(settings.circuit_probe_interval_seconds)
+            for breaker in list(self._breakers.values()):
+                breaker.probe()
+
+
+breakers = BreakerRegistry()
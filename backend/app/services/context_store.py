@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Deque, Dict, List, Optional
+
+
+# Most recent turns kept per session; older turns fall off the ring buffer
+HISTORY_LIMIT = 50
+# Number of lock stripes shared by all sessions
+LOCK_STRIPES = 64
 
 
 @dataclass
@@ -16,48 +26,72 @@ class SessionContext:
     text: str = ""
     provider: str = "ollama"
     model: str = "llama3.2"
-    history: List[ChatTurn] = field(default_factory=list)
+    history: Deque[ChatTurn] = field(default_factory=lambda: deque(maxlen=HISTORY_LIMIT))
 
 
 class ContextStore:
-    def __init__(self) -> None:
+    """Thread-safe, in-memory per-session context.
+
+    Sessions are guarded by a fixed pool of striped locks so that concurrent
+    streaming threads touching different sessions rarely contend, while writes
+    to the same session are serialized. History is a bounded deque, so trimming
+    to the most recent turns is O(1) per append.
+    """
+
+    def __init__(self, stripes: int = LOCK_STRIPES, history_limit: int = HISTORY_LIMIT) -> None:
         self._sessions: Dict[str, SessionContext] = {}
+        self._locks = [threading.RLock() for _ in range(max(1, stripes))]
+        self._history_limit = history_limit
+
+    def _lock_for(self, session_id: str) -> threading.RLock:
+        return self._locks[hash(session_id) % len(self._locks)]
 
     def get(self, session_id: str) -> SessionContext:
-        if session_id not in self._sessions:
-            self._sessions[session_id] = SessionContext()
-        return self._sessions[session_id]
+        ctx = self._sessions.get(session_id)
+        if ctx is not None:
+            return ctx
+        with self._lock_for(session_id):
+            ctx = self._sessions.get(session_id)
+            if ctx is None:
+                ctx = SessionContext(history=deque(maxlen=self._history_limit))
+                self._sessions[session_id] = ctx
+            return ctx
 
     def set_text(self, session_id: str, text: str) -> None:
-        self.get(session_id).text = text
+        with self._lock_for(session_id):
+            self.get(session_id).text = text
 
     def set_preferences(self, session_id: str, provider: str, model: str) -> None:
-        ctx = self.get(session_id)
-        ctx.provider = provider
-        ctx.model = model
+        with self._lock_for(session_id):
+            ctx = self.get(session_id)
+            ctx.provider = provider
+            ctx.model = model
 
     def get_preferences(self, session_id: str) -> tuple[str, str]:
-        ctx = self.get(session_id)
-        return ctx.provider, ctx.model
+        with self._lock_for(session_id):
+            ctx = self.get(session_id)
+            return ctx.provider, ctx.model
 
     # Conversation history APIs
     def append_history(self, session_id: str, role: str, content: str, timestamp: Optional[float] = None) -> None:
-        import time as _time
-        ctx = self.get(session_id)
-        ts = timestamp if timestamp is not None else _time.time()
-        ctx.history.append(ChatTurn(role=role, content=content, timestamp=ts))
-        # Trim to the most recent 50 turns to bound memory
-        if len(ctx.history) > 50:
-            ctx.history = ctx.history[-50:]
+        ts = timestamp if timestamp is not None else time.time()
+        turn = ChatTurn(role=role, content=content, timestamp=ts)
+        with self._lock_for(session_id):
+            # Bounded deque drops the oldest turn once the limit is reached
+            self.get(session_id).history.append(turn)
 
     def get_history(self, session_id: str, limit: Optional[int] = None) -> List[ChatTurn]:
-        ctx = self.get(session_id)
-        if limit is None or limit >= len(ctx.history):
-            return list(ctx.history)
-        return ctx.history[-limit:]
+        with self._lock_for(session_id):
+            history = self.get(session_id).history
+            if limit is None or limit >= len(history):
+                return list(history)
+            if limit <= 0:
+                return []
+            return list(islice(history, len(history) - limit, None))
 
     def clear_history(self, session_id: str) -> None:
-        self.get(session_id).history.clear()
+        with self._lock_for(session_id):
+            self.get(session_id).history.clear()
 
 
 context_store = ContextStore()
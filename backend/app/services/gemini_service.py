@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional, Iterator, List
+from typing import Iterable, Optional, Iterator, List, Sequence, Tuple
 import re
 
 from google import genai
@@ -8,13 +8,20 @@ from google.genai import types
 import os
 
 from app.core.settings import settings
+from app.services.http_clients import httpx_client_kwargs
+from app.services.llm_base import PromptMessage
+from app.services.llm_metrics import record_prompt_usage
 
 
 class GeminiService:
     def __init__(self) -> None:
         # Best practice: pick up GEMINI_API_KEY from environment; allow missing for local/dev fallback
         api_key = os.getenv("GEMINI_API_KEY") or settings.gemini_api_key
-        self.client = genai.Client(api_key=api_key) if api_key else None
+        self.client = (
+            genai.Client(api_key=api_key, http_options=types.HttpOptions(client_args=httpx_client_kwargs("gemini")))
+            if api_key
+            else None
+        )
 
     def stream_text_response(
         self,
@@ -44,6 +51,87 @@ class GeminiService:
         for chunk in stream:
             yield from self._extract_text_chunks(chunk)
 
+    def stream_messages_response(
+        self,
+        messages: Sequence[PromptMessage],
+        model_name: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        """Stream a structured prompt: system blocks become `system_instruction`, the rest
+        become user/model contents in order.
+
+        Gemini caches repeated prompt prefixes implicitly; keeping the system instruction and
+        the leading contents byte-identical across turns is what makes those hits possible.
+        Cached-token counts from `usage_metadata` are exported per model.
+        """
+        if self.client is None:
+            yield f"[dev-fallback] You said: {messages[-1].content if messages else ''}"
+            return
+
+        selected_model_name = model_name or settings.gemini_model
+        contents, config = self._message_request(messages, temperature)
+        stream = self.client.models.generate_content_stream(
+            model=selected_model_name,
+            contents=contents,
+            config=config,
+        )
+
+        usage = None
+        for chunk in stream:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield from self._extract_text_chunks(chunk)
+        self._record_usage(selected_model_name, usage)
+
+    def complete_messages_response(
+        self,
+        messages: Sequence[PromptMessage],
+        model_name: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        """One non-streaming `generate_content` call for a structured prompt; the text is
+        returned as the API sends it, without word-level splitting."""
+        if self.client is None:
+            return f"[dev-fallback] You said: {messages[-1].content if messages else ''}"
+
+        selected_model_name = model_name or settings.gemini_model
+        contents, config = self._message_request(messages, temperature)
+        response = self.client.models.generate_content(
+            model=selected_model_name,
+            contents=contents,
+            config=config,
+        )
+        self._record_usage(selected_model_name, getattr(response, "usage_metadata", None))
+        return response.text or ""
+
+    @staticmethod
+    def _message_request(
+        messages: Sequence[PromptMessage], temperature: float
+    ) -> Tuple[List[types.Content], types.GenerateContentConfig]:
+        system_text = "\n\n".join(m.content for m in messages if m.role == "system")
+        contents = [
+            types.Content(
+                role="model" if m.role == "assistant" else "user",
+                parts=[types.Part.from_text(text=m.content)],
+            )
+            for m in messages
+            if m.role != "system"
+        ]
+        config = types.GenerateContentConfig(
+            temperature=temperature,
+            system_instruction=system_text or None,
+        )
+        return contents, config
+
+    @staticmethod
+    def _record_usage(model_name: str, usage: object) -> None:
+        if usage is not None:
+            record_prompt_usage(
+                "gemini",
+                model_name,
+                getattr(usage, "prompt_token_count", None),
+                getattr(usage, "cached_content_token_count", None),
+            )
+
     def _extract_text_chunks(self, chunk: object) -> Iterator[str]:
         # Prefer direct text if available
         direct_text = getattr(chunk, "text", None)
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.core.settings import settings
+
+
+PRIMARY, HEDGE = 0, 1
+
+# Samples kept per provider/model for the first-chunk percentile, and the minimum
+# needed before the percentile is trusted over HEDGE_DEFAULT_DELAY_SECONDS
+FIRST_CHUNK_WINDOW = 200
+FIRST_CHUNK_MIN_SAMPLES = 20
+
+HEDGE_REQUESTS = Counter(
+    "llm_hedge_requests_total",
+    "Hedge-eligible streams by outcome",
+    ["provider", "outcome"],  # not_needed | hedged | over_budget | unavailable
+)
+HEDGE_WINS = Counter(
+    "llm_hedge_wins_total",
+    "Hedged streams by the side that produced the first chunk",
+    ["provider", "winner"],  # primary | hedge
+)
+HEDGE_LATENCY_WON = Histogram(
+    "llm_hedge_latency_won_seconds",
+    "How much earlier the hedge's first chunk arrived than the cancelled primary's",
+    ["provider"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+
+class FirstChunkLatency:
+    """Rolling time-to-first-chunk samples per provider/model, used to pick the hedge delay."""
+
+    def __init__(self, window: int = FIRST_CHUNK_WINDOW) -> None:
+        self._window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, provider: str, model: Optional[str], seconds: float) -> None:
+        key = (provider, model or "default")
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._window)).append(seconds)
+
+    def hedge_delay(self, provider: str, model: Optional[str]) -> float:
+        with self._lock:
+            samples = sorted(self._samples.get((provider, model or "default"), ()))
+        if len(samples) < FIRST_CHUNK_MIN_SAMPLES:
+            delay = settings.hedge_default_delay_seconds
+        else:
+            delay = samples[min(len(samples) - 1, math.ceil(settings.hedge_percentile * len(samples)) - 1)]
+        return max(delay, settings.hedge_min_delay_seconds)
+
+
+class HedgeBudget:
+    """Caps hedges to a fraction of eligible requests.
+
+    Every eligible request deposits `fraction` of a token and a hedge spends a whole
+    one; the balance is capped so a quiet period cannot bank a burst of hedges.
+    """
+
+    def __init__(self, cap: float = 10.0) -> None:
+        self._balance = 0.0
+        self._cap = cap
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._balance = min(self._cap, self._balance + settings.hedge_budget_fraction)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+
+class _Pump(threading.Thread):
+    """Drains one provider stream on a worker thread into the shared event queue."""
+
+    def __init__(self, side: int, opener: Callable[[], Iterable[str]], events: queue.Queue) -> None:
+        super().__init__(name=f"hedge-pump-{side}", daemon=True)
+        self.side = side
+        self._opener = opener
+        self._events = events
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._on_first_chunk: Optional[Callable[[float], None]] = None
+        self._on_exit: List[Callable[[], None]] = []
+        self._exited = False
+        # Run in the creating thread's context so the request trace sees provider phases
+        self._context = contextvars.copy_context()
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+
+    def cancel(self, on_first_chunk: Optional[Callable[[float], None]] = None) -> None:
+        """Stop forwarding chunks; `on_first_chunk` still hears when the first one would have arrived."""
+        with self._lock:
+            self._cancelled.set()
+            if on_first_chunk is not None and self.first_chunk_at is not None:
+                on_first_chunk(self.first_chunk_at)
+            else:
+                self._on_first_chunk = on_first_chunk
+
+    def when_done(self, callback: Callable[[], None]) -> None:
+        """Run `callback` once the provider stream has been closed; at once if it already has."""
+        with self._lock:
+            if not self._exited:
+                self._on_exit.append(callback)
+                return
+        callback()
+
+    def run(self) -> None:
+        self.started_at = time.perf_counter()
+        try:
+            self._context.run(self._pump)
+        finally:
+            with self._lock:
+                self._exited = True
+                callbacks, self._on_exit = self._on_exit, []
+            for callback in callbacks:
+                callback()
+
+    def _pump(self) -> None:
+        try:
+            chunks = iter(self._opener())
+            try:
+                for piece in chunks:
+                    if self.first_chunk_at is None:
+                        with self._lock:
+                            self.first_chunk_at = time.perf_counter()
+                            if self._on_first_chunk is not None:
+                                self._on_first_chunk(self.first_chunk_at)
+                    if self._cancelled.is_set():
+                        break
+                    self._events.put((self.side, "chunk", piece))
+            finally:
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+        except Exception as exc:  # noqa: BLE001 - handed to the consumer thread
+            self._events.put((self.side, "error", exc))
+            return
+        self._events.put((self.side, "end", None))
+
+
+class HedgedStream:
+    """Race a primary stream against a delayed hedge and yield whichever answers first.
+
+    The primary starts immediately. If it has produced nothing after `delay` seconds
+    and the budget allows, `start_hedge` is asked for a second stream. The first side
+    to produce a chunk (or to finish) wins and the other is cancelled; an error on one
+    side only surfaces if the other side cannot answer either. After the winner is
+    known, `winner`, `first_chunk_seconds` and `errors` describe the race.
+
+    Cancelling a side only stops its chunks from being forwarded: its provider call
+    keeps running on the pump thread until the next chunk arrives or it fails. Use
+    `release_when_done` to hold that side's provider slot until the call has stopped.
+    """
+
+    def __init__(
+        self,
+        primary: Callable[[], Iterable[str]],
+        start_hedge: Callable[[], Optional[Callable[[], Iterable[str]]]],
+        *,
+        delay: float,
+        provider: str,
+        budget: HedgeBudget,
+    ) -> None:
+        self._events: queue.Queue = queue.Queue()
+        self._start_hedge = start_hedge
+        self._provider = provider
+        self._budget = budget
+        self._deadline = time.perf_counter() + delay
+        self._hedge_decided = False
+        self._pumps: Dict[int, _Pump] = {PRIMARY: _Pump(PRIMARY, primary, self._events)}
+        self.winner: Optional[int] = None
+        self.first_chunk_seconds: Optional[float] = None
+        self.errors: Dict[int, Exception] = {}
+        budget.deposit()
+        self._pumps[PRIMARY].start()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        while True:
+            timeout = None
+            if not self._hedge_decided and self.winner is None:
+                timeout = max(0.0, self._deadline - time.perf_counter())
+            try:
+                side, kind, payload = self._events.get(timeout=timeout)
+            except queue.Empty:
+                self._launch_hedge()
+                continue
+            if self.winner is not None and side != self.winner:
+                continue  # late events from the cancelled side
+            if kind == "chunk":
+                if self.winner is None:
+                    self._declare(side)
+                return payload
+            if kind == "end":
+                if self.winner is None:
+                    self._declare(side)
+                raise StopIteration
+            # kind == "error"
+            if self.winner is not None:
+                raise payload
+            self.errors[side] = payload
+            if len(self.errors) == len(self._pumps):
+                raise self.errors[PRIMARY]
+
+    def close(self) -> None:
+        for pump in self._pumps.values():
+            pump.cancel()
+
+    def release_when_done(self, side: int, release: Callable[[], None]) -> None:
+        """Call `release` once `side`'s provider stream has stopped (at once if it never started)."""
+        pump = self._pumps.get(side)
+        if pump is None:
+            release()
+        else:
+            pump.when_done(release)
+
+    def _launch_hedge(self) -> None:
+        self._hedge_decided = True
+        if not self._budget.try_spend():
+            HEDGE_REQUESTS.labels(provider=self._provider, outcome="over_budget").inc()
+            return
+        opener = self._start_hedge()
+        if opener is None:
+            HEDGE_REQUESTS.labels(provider=self._provider, outcome="unavailable").inc()
+            return
+        HEDGE_REQUESTS.labels(provider=self._provider, outcome="hedged").inc()
+        self._pumps[HEDGE] = _Pump(HEDGE, opener, self._events)
+        self._pumps[HEDGE].start()
+
+    def _declare(self, side: int) -> None:
+        self.winner = side
+        winner = self._pumps[side]
+        first_at = winner.first_chunk_at or time.perf_counter()
+        self.first_chunk_seconds = first_at - winner.started_at
+        if HEDGE not in self._pumps:
+            if not self._hedge_decided:
+                HEDGE_REQUESTS.labels(provider=self._provider, outcome="not_needed").inc()
+            return
+        HEDGE_WINS.labels(provider=self._provider, winner="hedge" if side == HEDGE else "primary").inc()
+        loser = self._pumps[PRIMARY if side == HEDGE else HEDGE]
+        if side == HEDGE:
+            histogram = HEDGE_LATENCY_WON.labels(provider=self._provider)
+            loser.cancel(lambda primary_at: histogram.observe(max(0.0, primary_at - first_at)))
+        else:
+            loser.cancel()
+
+
+first_chunk_latency = FirstChunkLatency()
+hedge_budget = HedgeBudget()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+import httpx
+from prometheus_client import Counter
+
+from app.core.settings import settings
+from app.core.tracing import current_trace
+
+try:
+    import h2  # noqa: F401 - only needed for httpx's HTTP/2 support
+except Exception:  # pragma: no cover
+    _HTTP2_AVAILABLE = False
+else:
+    _HTTP2_AVAILABLE = True
+
+
+T = TypeVar("T")
+
+HTTP_CONNECTIONS = Counter(
+    "llm_http_requests_by_connection_total",
+    "Outbound provider HTTP requests by whether they opened a new connection or reused a pooled one",
+    ["client", "connection"],  # new | reused
+)
+CLIENT_CACHE = Counter(
+    "llm_client_cache_total",
+    "Provider client lookups by cache outcome",
+    ["kind", "outcome"],  # hit | miss
+)
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Stable cache-key component for an API key, without keeping the key itself in the key."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def temperature_class(temperature: float) -> float:
+    # One client per 0.1 step; finer distinctions are not worth a separate connection pool
+    return round(temperature, 1)
+
+
+def _connection_tracer(client: str) -> Dict[str, Callable[..., None]]:
+    """httpx event hooks that count new vs reused connections and time connection setup,
+    via httpcore's trace extension."""
+
+    def on_request(request: httpx.Request) -> None:
+        inner = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.started":
+                trace.opened = time.perf_counter()  # type: ignore[attr-defined]
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                trace.connected = time.perf_counter()  # type: ignore[attr-defined]
+            if inner is not None:
+                inner(event_name, info)
+
+        trace.opened = None  # type: ignore[attr-defined]
+        trace.connected = None  # type: ignore[attr-defined]
+        request.extensions["trace"] = trace
+
+    def on_response(response: httpx.Response) -> None:
+        trace = response.request.extensions.get("trace")
+        if not hasattr(trace, "opened"):
+            return
+        opened, connected = trace.opened, trace.connected
+        HTTP_CONNECTIONS.labels(client=client, connection="reused" if opened is None else "new").inc()
+        if opened is not None and connected is not None:
+            # TCP + TLS setup; absent from the request trace when a pooled connection was reused
+            current_trace().add("provider_connect", opened, connected - opened)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def httpx_client_kwargs(client: str) -> Dict[str, Any]:
+    """Keyword arguments for an `httpx.Client` with keep-alive pooling, HTTP/2 when available,
+    and connection reuse metrics. Pass to SDKs that build their own httpx client."""
+    return {
+        "http2": settings.http2_enabled and _HTTP2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "event_hooks": _connection_tracer(client),
+    }
+
+
+class ClientCache:
+    """Small LRU of SDK client objects, so each (model, key, temperature class) reuses one
+    client and its connection pool instead of building a new one per call."""
+
+    def __init__(self, kind: str, max_size: Optional[int] = None) -> None:
+        self.kind = kind
+        self._max_size = max_size or settings.client_cache_size
+        self._clients: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                CLIENT_CACHE.labels(kind=self.kind, outcome="hit").inc()
+                return client
+        CLIENT_CACHE.labels(kind=self.kind, outcome="miss").inc()
+        # Build outside the lock; if two threads race, the first one stored wins
+        built = factory()
+        with self._lock:
+            client = self._clients.setdefault(key, built)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self._max_size:
+                self._clients.popitem(last=False)
+        return client
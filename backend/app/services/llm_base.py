@@ -1,6 +1,58 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional, Protocol
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Optional, Protocol, Sequence
+
+
+class ProviderError(RuntimeError):
+    """A provider call failed (unreachable, rejected, or errored mid-stream)."""
+
+
+@dataclass(frozen=True)
+class PromptMessage:
+    """One block of a structured prompt.
+
+    `role` is "system", "context" (documents and summaries the answer should rely on),
+    "user" or "assistant". Providers map these onto their native chat formats.
+    """
+
+    role: str
+    content: str
+
+
+def render_messages(messages: Sequence[PromptMessage]) -> str:
+    """Flatten a structured prompt into a single completion-style string."""
+    blocks: list[str] = []
+    turns: list[str] = []
+    for message in messages[:-1]:
+        if message.role in ("user", "assistant"):
+            turns.append(f"{message.role.capitalize()}: {message.content}")
+        else:
+            blocks.append(message.content)
+    if turns:
+        blocks.append("Recent conversation:\n" + "\n".join(turns))
+    if messages:
+        blocks.append(f"User: {messages[-1].content}\nAssistant:")
+    return "\n\n".join(blocks)
+
+
+def prefix_fingerprint(messages: Sequence[PromptMessage]) -> str:
+    """Hash of the leading system/context blocks, i.e. the part of the prompt shared across turns.
+
+    A context block directly before the final question holds the snippets retrieved for
+    that question (see `Orchestrator._build_messages`) and is left out, so a first turn,
+    which has no history in between, still gets a stable fingerprint.
+    """
+    stable = list(messages[:-1])
+    if stable and stable[-1].role == "context":
+        stable.pop()
+    digest = hashlib.sha256()
+    for message in stable:
+        if message.role in ("user", "assistant"):
+            break
+        digest.update(f"{message.role}\x00{message.content}\x00".encode("utf-8"))
+    return digest.hexdigest()[:32]
 
 
 class LLMStreamingProvider(Protocol):
@@ -13,3 +65,29 @@ class LLMStreamingProvider(Protocol):
     ) -> Iterable[str]:
         """Stream text chunks for the given prompt."""
         ...
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        """Stream text chunks for a structured prompt; the last message is the user's question.
+
+        Providers with a chat API should override this; the default flattens the messages.
+        """
+        return self.stream_text(render_messages(messages), model=model, temperature=temperature)
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        """Return the whole answer for a structured prompt in one call.
+
+        Providers should override this with their non-streaming API; the default joins the stream.
+        """
+        return "".join(self.stream_messages(messages, model=model, temperature=temperature))
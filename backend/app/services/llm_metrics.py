@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+
+
+def estimate_tokens(chars: int) -> int:
+    # ~4 characters per token is close enough for English prose across providers
+    return max(chars, 0) // 4
+
+
+LLM_PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens_total",
+    "Prompt tokens billed by the provider",
+    ["provider", "model"],
+)
+LLM_CACHED_PROMPT_TOKENS = Counter(
+    "llm_cached_prompt_tokens_total",
+    "Prompt tokens the provider served from its prompt/prefix cache",
+    ["provider", "model"],
+)
+
+
+def record_prompt_usage(provider: str, model: str, prompt_tokens: Optional[int], cached_tokens: Optional[int]) -> None:
+    """Export provider-reported prompt usage; missing counts are treated as zero."""
+    LLM_PROMPT_TOKENS.labels(provider=provider, model=model).inc(prompt_tokens or 0)
+    LLM_CACHED_PROMPT_TOKENS.labels(provider=provider, model=model).inc(cached_tokens or 0)
+
+
+# Streaming latency, measured inside the orchestrator from the provider call to the last chunk
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 40, 80)
+
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from starting the provider call to the first streamed chunk (includes failover)",
+    ["provider", "model"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_INTER_CHUNK_GAP = Histogram(
+    "llm_inter_chunk_gap_seconds",
+    "Time between consecutive streamed chunks",
+    ["provider", "model"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+LLM_GENERATION_TIME = Histogram(
+    "llm_generation_seconds",
+    "Time from starting the provider call to the end of the stream",
+    ["provider", "model"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_OUTPUT_CHARS = Counter(
+    "llm_output_chars_total",
+    "Characters streamed back by providers",
+    ["provider", "model"],
+)
+LLM_OUTPUT_TOKENS = Histogram(
+    "llm_output_tokens",
+    "Estimated output tokens per stream (~4 characters per token)",
+    ["provider", "model"],
+    buckets=(16, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+LLM_OUTPUT_TOKENS_PER_SECOND = Histogram(
+    "llm_output_tokens_per_second",
+    "Estimated output tokens per second after the first chunk",
+    ["provider", "model"],
+    buckets=(1, 5, 10, 20, 40, 60, 80, 120, 200, 400),
+)
+LLM_PROMPT_CHARS = Histogram(
+    "llm_prompt_chars",
+    "Characters in the prompt sent to the provider",
+    ["provider", "model"],
+    buckets=(256, 1024, 4096, 16384, 32768, 65536, 131072, 262144, 524288),
+)
+LLM_STREAMS = Counter(
+    "llm_streams_total",
+    "Provider streams by how they ended",
+    ["provider", "model", "outcome"],  # completed | cancelled | error
+)
+LLM_COMPLETIONS = Counter(
+    "llm_completions_total",
+    "Non-streaming provider calls by outcome",
+    ["provider", "model", "outcome"],  # completed | error
+)
+
+
+def record_completion(
+    provider: str, model: Optional[str], outcome: str, prompt_chars: int = 0, text: str = "", seconds: float = 0.0
+) -> None:
+    """Export a non-streaming call; a completed call's duration counts as generation time."""
+    labels = {"provider": provider, "model": model or "default"}
+    LLM_COMPLETIONS.labels(outcome=outcome, **labels).inc()
+    if outcome != "completed":
+        return
+    LLM_PROMPT_CHARS.labels(**labels).observe(prompt_chars)
+    LLM_GENERATION_TIME.labels(**labels).observe(seconds)
+    LLM_OUTPUT_CHARS.labels(**labels).inc(len(text))
+    LLM_OUTPUT_TOKENS.labels(**labels).observe(estimate_tokens(len(text)))
+
+
+class StreamMeter:
+    """Collects timings for one streamed generation and exports them when it ends.
+
+    Chunk gaps are observed as they happen; everything else is recorded once by
+    `finish`, labelled with the provider/model that actually served the stream.
+    """
+
+    def __init__(self, prompt_chars: int) -> None:
+        self.prompt_chars = prompt_chars
+        self.started = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.chars = 0
+        self._gap = None
+        self._finished = False
+
+    def chunk(self, text: str, provider: str, model: Optional[str]) -> None:
+        now = time.perf_counter()
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+            self._gap = LLM_INTER_CHUNK_GAP.labels(provider=provider, model=model or "default")
+        else:
+            self._gap.observe(now - self.last_chunk_at)
+        self.last_chunk_at = now
+        self.chars += len(text)
+
+    def finish(self, provider: str, model: Optional[str], outcome: str) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        labels = {"provider": provider, "model": model or "default"}
+        now = time.perf_counter()
+        LLM_STREAMS.labels(outcome=outcome, **labels).inc()
+        LLM_PROMPT_CHARS.labels(**labels).observe(self.prompt_chars)
+        if self.first_chunk_at is None:
+            return
+        LLM_TIME_TO_FIRST_TOKEN.labels(**labels).observe(self.first_chunk_at - self.started)
+        LLM_GENERATION_TIME.labels(**labels).observe(now - self.started)
+        LLM_OUTPUT_CHARS.labels(**labels).inc(self.chars)
+        tokens = estimate_tokens(self.chars)
+        LLM_OUTPUT_TOKENS.labels(**labels).observe(tokens)
+        streaming = self.last_chunk_at - self.first_chunk_at
+        if streaming > 0:
+            LLM_OUTPUT_TOKENS_PER_SECOND.labels(**labels).observe(tokens / streaming)
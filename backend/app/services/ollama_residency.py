@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional, Set, Union
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.settings import parse_provider_map, settings
+
+
+logger = logging.getLogger("app.ollama")
+
+OLLAMA_RESIDENT = Gauge(
+    "ollama_model_resident",
+    "1 while the model is loaded in the Ollama server",
+    ["model"],
+)
+OLLAMA_VRAM_BYTES = Gauge(
+    "ollama_model_vram_bytes",
+    "VRAM held by a loaded model",
+    ["model"],
+)
+OLLAMA_WARMUPS = Counter(
+    "ollama_model_warmups_total",
+    "Model warm-up requests by outcome",
+    ["model", "outcome"],  # loaded | failed
+)
+OLLAMA_PREFILL = Histogram(
+    "ollama_prefill_seconds",
+    "Prompt evaluation (prefill) time per request; drops when the KV cache covers the prompt prefix",
+    ["model"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+OLLAMA_PROMPT_EVAL_TOKENS = Histogram(
+    "ollama_prompt_eval_tokens",
+    "Prompt tokens evaluated per request (tokens reused from the KV cache are not counted)",
+    ["model"],
+    buckets=(16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384),
+)
+OLLAMA_LOAD = Histogram(
+    "ollama_model_load_seconds",
+    "Model load time paid by a request (near zero when the model was resident)",
+    ["model"],
+    buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60),
+)
+
+
+def _seconds(nanoseconds: Optional[int]) -> float:
+    return (nanoseconds or 0) / 1e9
+
+
+def _tagged(model: str) -> str:
+    # /api/ps reports "llama3.2:latest" for a model requested as "llama3.2"
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelResidency:
+    """Keeps configured Ollama models loaded and tracks which ones are.
+
+    Every request carries a per-model `keep_alive` so the server does not unload the
+    model between turns. `start()` warms `OLLAMA_WARM_MODELS` in the background and then
+    polls `/api/ps` so `loaded_models` and the residency gauges stay current.
+    """
+
+    def __init__(self) -> None:
+        self._loaded: Set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def keep_alive(model: str) -> Union[str, float]:
+        override = parse_provider_map(settings.ollama_keep_alive_overrides).get(model)
+        return override if override is not None else settings.ollama_keep_alive
+
+    @staticmethod
+    def options(temperature: float) -> dict:
+        options: dict = {"temperature": temperature}
+        if settings.ollama_num_ctx > 0:
+            options["num_ctx"] = settings.ollama_num_ctx
+        return options
+
+    @property
+    def loaded_models(self) -> Set[str]:
+        with self._lock:
+            return set(self._loaded)
+
+    def is_loaded(self, model: str) -> bool:
+        with self._lock:
+            return _tagged(model) in self._loaded
+
+    def observe_response(self, model: str, final: Any) -> None:
+        """Record prefill/load timings from the final streamed chunk of a request."""
+        OLLAMA_PREFILL.labels(model=model).observe(_seconds(final.get("prompt_eval_duration")))
+        OLLAMA_PROMPT_EVAL_TOKENS.labels(model=model).observe(final.get("prompt_eval_count") or 0)
+        OLLAMA_LOAD.labels(model=model).observe(_seconds(final.get("load_duration")))
+        self._mark_loaded(model)
+
+    def warm(self, client: Any, model: str) -> bool:
+        """Load `model` with an empty prompt so the first real request skips the load."""
+        try:
+            client.generate(model=model, prompt="", keep_alive=self.keep_alive(model), options=self.options(0.0))
+        except Exception as exc:  # noqa: BLE001 - warming is best effort
+            logger.warning("could not warm ollama model %s: %s", model, exc)
+            OLLAMA_WARMUPS.labels(model=model, outcome="failed").inc()
+            return False
+        OLLAMA_WARMUPS.labels(model=model, outcome="loaded").inc()
+        self._mark_loaded(model)
+        return True
+
+    def refresh(self, client: Any) -> Set[str]:
+        """Sync the loaded set with the server's running models."""
+        running = client.ps().get("models") or []
+        loaded = {_tagged(m.get("model") or m.get("name")) for m in running}
+        with self._lock:
+            for model in self._loaded - loaded:
+                OLLAMA_RESIDENT.labels(model=model).set(0)
+                OLLAMA_VRAM_BYTES.labels(model=model).set(0)
+            self._loaded = loaded
+        for m in running:
+            model = _tagged(m.get("model") or m.get("name"))
+            OLLAMA_RESIDENT.labels(model=model).set(1)
+            OLLAMA_VRAM_BYTES.labels(model=model).set(m.get("size_vram") or 0)
+        return loaded
+
+    def start(self, client_getter: Callable[[], Any]) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(client_getter,), name="ollama-residency", daemon=True)
+        self._thread.start()
+
+    def _run(self, client_getter: Callable[[], Any]) -> None:
+        models = [m.strip() for m in settings.ollama_warm_models.split(",") if m.strip()]
+        try:
+            client = client_getter()
+        except Exception as exc:  # noqa: BLE001 - Ollama not configured or unreachable
+            logger.warning("ollama residency manager disabled: %s", exc)
+            return
+        for model in models:
+            self.warm(client, model)
+        while settings.ollama_residency_poll_seconds > 0:
+            try:
+                loaded = self.refresh(client)
+            except Exception as exc:  # noqa: BLE001 - keep polling through server restarts
+                logger.debug("ollama ps failed: %s", exc)
+            else:
+                # Reload warm models the server evicted (restart, memory pressure)
+                for model in models:
+                    if _tagged(model) not in loaded:
+                        self.warm(client, model)
+            time.sleep(settings.ollama_residency_poll_seconds)
+
+    def _mark_loaded(self, model: str) -> None:
+        model = _tagged(model)
+        with self._lock:
+            self._loaded.add(model)
+        OLLAMA_RESIDENT.labels(model=model).set(1)
+
+
+residency = ModelResidency()
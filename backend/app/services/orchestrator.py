@@ -1,29 +1,145 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, Optional
+import time
+import weakref
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
+from prometheus_client import Counter
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.services.admission import AdmissionRejected, Priority, Slot, admission
+from app.services.archiver import rehydrate
+from app.services.circuit_breaker import CircuitBreaker, breakers
 from app.services.context_store import context_store
+from app.services.hedging import HEDGE, PRIMARY, HedgedStream, first_chunk_latency, hedge_budget
 from app.services.rag_store import rag_store
-from app.services.llm_base import LLMStreamingProvider
-from app.services.providers_langchain import LangchainGeminiProvider, LangchainOllamaProvider
-from app.services.providers_ollama import OllamaProvider
-from app.services.providers_gemini import GeminiProvider
-from app.services.providers_openai import OpenAIProvider
+from app.services.summarizer import (
+    SUMMARY_AGE_MESSAGES,
+    SUMMARY_AGE_SECONDS,
+    SUMMARY_TOKENS_SAVED,
+    summarizer,
+)
+from app.services.llm_base import LLMStreamingProvider, PromptMessage, ProviderError
+from app.services.llm_metrics import StreamMeter, estimate_tokens, record_completion
+from app.services.provider_registry import default_registry
 from app.core.db import SessionLocal
+from app.core.tracing import RequestTrace, current_trace
+from app.core.settings import parse_fallbacks, settings
 from app.models import Chat, Message
 
 
 DEFAULT_CHAT_TITLE = "New chat"
+# Sent first on every request; keep it byte-stable so provider prompt caches can reuse it
+SYSTEM_PROMPT = """\
+You are a helpful, neutral AI assistant.
+
+Your role is to answer questions, analyze information, write and review code, and assist with technical, academic, and practical tasks.
+
+When documents, attachments, or retrieved context are provided:
+- Treat them as the primary source of truth
+- Base your answers strictly on that content
+- Do not add or assume information that is not present
+- If the answer cannot be found in the context, say you don't know
+
+Read and analyze all user-provided attachments carefully and respond accurately.
+
+Be clear, concise, and professional. Use structured responses when helpful.
+
+When writing code, prioritize clarity, correctness, and best practices.
+
+Do not fabricate information or claim access to private data.
+"""
+
+# Messages sent verbatim when a chat has no rolling summary yet
+RECENT_HISTORY_MESSAGES = 10
+
+LLM_FAILOVER = Counter(
+    "llm_failover_total",
+    "Requests moved to a fallback provider",
+    ["from_provider", "to_provider", "reason"],  # reason: circuit_open | overloaded | unavailable | error
+)
+
+
+class _Route(NamedTuple):
+    """A provider/model the request is currently bound to, with its breaker and slot."""
+
+    provider: str
+    model: Optional[str]
+    llm: LLMStreamingProvider
+    breaker: CircuitBreaker
+    slot: Slot
+
+
+class AdmissionTicket:
+    """A provider slot taken by `Orchestrator.admit`, to be passed to `stream` or `complete`."""
+
+    def __init__(self, route: _Route, fallbacks: List[Tuple[str, Optional[str]]]) -> None:
+        self._route = route
+        self._fallbacks = fallbacks
+        self._taken = False
+
+    def take(self) -> Tuple[_Route, List[Tuple[str, Optional[str]]]]:
+        if self._taken:
+            raise RuntimeError("admission ticket already used")
+        self._taken = True
+        return self._route, self._fallbacks
+
+    def release(self) -> None:
+        """Give the slot back when the request ends before the ticket is used."""
+        if not self._taken:
+            self._taken = True
+            self._route.breaker.release_trial()
+            self._route.slot.release()
+
+
+class _Rejections:
+    """Why candidates were passed over while choosing a route, for failover metrics."""
+
+    def __init__(self, failed_from: Optional[str]) -> None:
+        self.first: Optional[Exception] = None
+        self.previous = failed_from
+        self.reason = "error"
+
+    def add(self, provider_key: str, exc: Exception, reason: str) -> None:
+        self.first = self.first or exc
+        self.previous, self.reason = self.previous or provider_key, reason
+
+    def bound(self, provider_key: str) -> None:
+        if self.previous is not None and self.previous != provider_key:
+            LLM_FAILOVER.labels(from_provider=self.previous, to_provider=provider_key, reason=self.reason).inc()
+
+
+class ChatCompletion(NamedTuple):
+    """A whole answer from `Orchestrator.complete`, with the resolved chat id."""
+
+    text: str
+    chat_id: int
+
+
+class ChatStream:
+    """Iterator over response chunks that also exposes the resolved chat id."""
+
+    def __init__(self, chunks: Iterator[str], chat_id: int) -> None:
+        self._chunks = chunks
+        self.chat_id = chat_id
+
+    def __iter__(self) -> ChatStream:
+        return self
+
+    def __next__(self) -> str:
+        return next(self._chunks)
+
+    def close(self) -> None:
+        self._chunks.close()
 
 
 class Orchestrator:
     def __init__(self) -> None:
-        # Provider registry; can expand to ollama, hf, etc.
-        self._providers: Dict[str, LLMStreamingProvider] = {
-            "gemini": GeminiProvider(),
-            "ollama": OllamaProvider(),
-            "openai": OpenAIProvider(),
-        }
+        # Provider registry; clients are built on first use, can expand to hf, etc.
+        self._providers = default_registry()
         self._default_provider = "gemini"
 
     def _generate_title(self, user_prompt: str) -> str:
@@ -53,54 +169,123 @@ class Orchestrator:
                 text = text + "..."
         return text or DEFAULT_CHAT_TITLE
 
-    def _build_prompt(self, session_id: str, user_prompt: str, chat_id: Optional[int] = None) -> str:
+    @staticmethod
+    def _add_message(db: Session, chat_id: int, role: str, content: str) -> int:
+        """Insert a message and update the chat's activity columns in the same transaction.
+
+        A chat archived in the meantime is restored first, so the message never lands next
+        to an archive blob that `list_messages` would read instead. Returns the chat's new
+        message_count.
+        """
+        now = datetime.utcnow()
+        message_count = None
+        for _ in range(3):
+            # Only a hot chat takes the message; the row lock keeps the archiver out until commit
+            message_count = db.execute(
+                update(Chat)
+                .where(Chat.id == chat_id, Chat.archived_at.is_(None))
+                .values(message_count=Chat.message_count + 1, last_message_at=now, updated_at=now)
+                .returning(Chat.message_count)
+            ).scalar_one_or_none()
+            # Archived since its history was read: restore it, then try again
+            if message_count is not None or not db.scalar(select(Chat.archived_at).where(Chat.id == chat_id)):
+                break
+            rehydrate(db, chat_id)
+        db.add(Message(chat_id=chat_id, role=role, content=content, created_at=now))
+        db.commit()
+        return message_count or 0
+
+    @staticmethod
+    def _chat_history(chat_id: int) -> tuple[str, list[tuple[str, str]]]:
+        """Return (rolling summary, recent (role, content) turns) for the prompt.
+
+        With a summary, only messages it does not cover yet are sent verbatim, so the
+        prompt stays roughly constant in size as the chat grows.
+        """
+        with SessionLocal() as db:
+            chat = db.get(Chat, chat_id)
+            if chat is not None and chat.archived_at is not None:
+                # The chat is active again: move it out of cold storage before reading history
+                rehydrate(db, chat_id)
+                chat = db.get(Chat, chat_id)
+            summary = (chat.summary or "") if chat is not None else ""
+            if summary:
+                upto_id = chat.summary_upto_id
+                # The summarizer runs every N turns; allow for it lagging one run behind
+                limit = 2 * (settings.summary_recent_messages + 2 * settings.summary_every_n_turns)
+                SUMMARY_TOKENS_SAVED.inc(estimate_tokens(chat.summary_source_chars - len(summary)))
+                if chat.summary_updated_at is not None:
+                    SUMMARY_AGE_SECONDS.observe((datetime.utcnow() - chat.summary_updated_at).total_seconds())
+                recent = list(
+                    db.scalars(
+                        select(Message)
+                        .where(Message.chat_id == chat_id, Message.id > upto_id)
+                        .order_by(Message.created_at.desc(), Message.id.desc())
+                        .limit(limit)
+                    )
+                )
+                recent.reverse()
+            else:
+                # Advance the window in steps of RECENT_HISTORY_MESSAGES rather than one message
+                # per turn, so the history prefix stays identical across turns and the provider's
+                # prompt/KV cache can reuse it. Between N and 2N-1 messages are sent.
+                total = chat.message_count if chat is not None else 0
+                window = RECENT_HISTORY_MESSAGES
+                offset = (total - window) // window * window if total > window else 0
+                recent = list(
+                    db.scalars(
+                        select(Message)
+                        .where(Message.chat_id == chat_id)
+                        .order_by(Message.created_at.asc(), Message.id.asc())
+                        .offset(offset)
+                        .limit(2 * window)
+                    )
+                )
+        if summary:
+            SUMMARY_AGE_MESSAGES.observe(len(recent))
+        return summary, [(m.role, m.content) for m in recent]
+
+    def _build_messages(self, session_id: str, user_prompt: str, chat_id: Optional[int] = None) -> List[PromptMessage]:
+        """Lay the prompt out as system instructions, document context, prior turns, retrieved
+        snippets, then the question."""
         base_ctx = context_store.get(session_id).text
         # Pull the last N conversation turns to provide context (prefer DB chat when available)
-        history_block = ""
+        summary_block = ""
+        turns: list[tuple[str, str]] = []
         if chat_id is not None:
-            with SessionLocal() as db:
-                msgs = (
-                    db.query(Message)
-                    .filter(Message.chat_id == chat_id)
-                    .order_by(Message.created_at.asc(), Message.id.asc())
-                    .all()
-                )
-                history_block = "\n".join([f"{m.role.capitalize()}: {m.content}" for m in msgs[-10:]]) if msgs else ""
+            with current_trace().span("history"):
+                summary_block, turns = self._chat_history(chat_id)
         else:
-            turns = context_store.get_history(session_id, limit=10)
-            history_block = "\n".join([f"{t.role.capitalize()}: {t.content}" for t in turns]) if turns else ""
+            turns = [(t.role, t.content) for t in context_store.get_history(session_id, limit=RECENT_HISTORY_MESSAGES)]
         rag_hits = rag_store.retrieve(session_id, user_prompt, k=4)
         rag_block = "\n\n".join([f"[Doc {i+1} | score={score:.3f}]\n{content}" for i, (content, score) in enumerate(rag_hits)])
 
+        # Ordered from most to least stable so the cached prefix is as long as possible: the
+        # uploaded document only changes on upload and the summary every few turns, the
+        # history window in steps, while retrieved snippets depend on each question.
         context_sections = []
         if base_ctx:
             context_sections.append(f"Uploaded context (raw):\n{base_ctx}")
-        if rag_block:
-            context_sections.append(f"Top relevant snippets from uploaded files:\n{rag_block}")
-
-        if history_block:
-            context_sections.append(f"Recent conversation:\n{history_block}")
+        if summary_block:
+            context_sections.append(f"Summary of earlier conversation:\n{summary_block}")
 
+        messages = [PromptMessage("system", SYSTEM_PROMPT)]
         if context_sections:
             joined = "\n\n".join(context_sections)
-            return (
-                "You are a helpful assistant. When answering, rely primarily on the provided context. "
-                "If the answer cannot be found in the context, say you don't know.\n\n"
-                f"Context:\n{joined}\n\nUser: {user_prompt}\nAssistant:"
-            )
-        return user_prompt
+            messages.append(PromptMessage("context", f"Context:\n{joined}"))
+        messages.extend(PromptMessage(role, content) for role, content in turns)
+        if rag_block:
+            messages.append(PromptMessage("context", f"Top relevant snippets from uploaded files:\n{rag_block}"))
+        messages.append(PromptMessage("user", user_prompt))
+        return messages
 
-    def stream(
+    def resolve_provider(
         self,
-        *,
         session_id: str,
-        prompt: str,
-        chat_id: Optional[int] = None,
         provider: Optional[str] = None,
         model: Optional[str] = None,
-        temperature: float = 0.3,
-    ) -> Iterable[str]:
-        """Stream response from the selected provider."""
+    ) -> tuple[str, Optional[str]]:
+        """Pick the provider key and model for a request, falling back to session preferences."""
         # Merge session preferences if not explicitly provided
         session_provider, session_model = context_store.get_preferences(session_id)
         provider_key = provider or session_provider or self._default_provider
@@ -114,70 +299,441 @@ class Orchestrator:
         # Fallback to default if unknown provider key appears
         if provider_key not in self._providers:
             provider_key = self._default_provider
-        llm = self._providers[provider_key]
-        # Prepend a system prompt
-        system_prompt = """
-            You are a helpful, neutral AI assistant.
+        return provider_key, model_name
 
-            Your role is to answer questions, analyze information, write and review code, and assist with technical, academic, and practical tasks.
+    def stream(
+        self,
+        *,
+        session_id: str,
+        prompt: str,
+        chat_id: Optional[int] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        priority: Priority = Priority.INTERACTIVE,
+        ticket: Optional[AdmissionTicket] = None,
+    ) -> ChatStream:
+        """Stream response from the selected provider.
 
-            When documents, attachments, or retrieved context are provided:
-            - Treat them as the primary source of truth
-            - Base your answers strictly on that content
-            - Do not add or assume information that is not present
-            - If the context is insufficient, clearly state so
+        A provider slot is taken from admission control before any work is done, so an
+        overloaded provider rejects the request (AdmissionRejected) without side effects.
+        Providers whose circuit is open are skipped in favour of the configured
+        fallbacks (`PROVIDER_FALLBACKS`); with `HEDGE_ENABLED` a slow first chunk
+        races the first fallback against the primary. Pass the `ticket` from `admit`
+        to use a slot already taken on the event loop.
 
-            Read and analyze all user-provided attachments carefully and respond accurately.
+        Phase timings go to the current request trace (see `app.core.tracing`).
+        """
+        trace = current_trace()
+        route, fallbacks = self._admit_sync(trace, session_id, provider, model, priority, ticket)
+        try:
+            return self._stream_with_slot(
+                route,
+                trace=trace,
+                fallbacks=fallbacks,
+                priority=priority,
+                session_id=session_id,
+                prompt=prompt,
+                chat_id=chat_id,
+                temperature=temperature,
+            )
+        except BaseException:
+            route.breaker.release_trial()
+            route.slot.release()
+            raise
+
+    def complete(
+        self,
+        *,
+        session_id: str,
+        prompt: str,
+        chat_id: Optional[int] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        priority: Priority = Priority.NON_STREAMING,
+        ticket: Optional[AdmissionTicket] = None,
+    ) -> ChatCompletion:
+        """Answer in one non-streaming provider call, persisted like a streamed turn.
 
-            Be clear, concise, and professional. Use structured responses when helpful.
+        Admission, breakers and failover behave as in `stream`; since nothing has been sent
+        to the client until the call returns, any failed call can fail over. Hedging is
+        stream-only (it races first chunks) and does not apply.
+        """
+        trace = current_trace()
+        route, remaining = self._admit_sync(trace, session_id, provider, model, priority, ticket)
+        try:
+            db_chat_id, messages = self._prepare_turn(trace, session_id, prompt, chat_id)
+            prompt_chars = sum(len(m.content) for m in messages)
+            while True:
+                started = time.perf_counter()
+                try:
+                    text = route.llm.complete(messages, model=route.model, temperature=temperature)
+                except Exception as exc:
+                    route.breaker.record_failure()
+                    record_completion(route.provider, route.model, "error")
+                    if not remaining:
+                        raise
+                    route.slot.release()
+                    try:
+                        route = self._acquire_route(remaining, priority, failed_from=route.provider)
+                    except (AdmissionRejected, ProviderError):
+                        raise exc
+                    remaining = remaining[remaining.index((route.provider, route.model)) + 1 :]
+                    continue
+                elapsed = time.perf_counter() - started
+                trace.add("generation", started, elapsed)
+                route.breaker.record_success()
+                record_completion(route.provider, route.model, "completed", prompt_chars, text, elapsed)
+                break
+        except BaseException:
+            route.breaker.release_trial()
+            raise
+        finally:
+            route.slot.release()
+        self._finish_turn(trace, session_id, db_chat_id, text, route)
+        return ChatCompletion(text, db_chat_id)
 
-            When writing code, prioritize clarity, correctness, and best practices.
+    async def admit(
+        self,
+        *,
+        session_id: str,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AdmissionTicket:
+        """Take a provider slot for `stream` or `complete`, queueing on the event loop.
 
-            Do not fabricate information or claim access to private data.
+        Routes call this before handing the request to a worker thread: a request waiting
+        for a slot then holds no thread, so queued requests cannot starve the streams whose
+        next chunks (each run on a worker thread) would free one. Raises like `stream`.
         """
+        provider_key, model_name = self.resolve_provider(session_id, provider, model)
+        candidates = self._candidates(provider_key, model_name)
+        with current_trace().span("admission"):
+            route = await self._acquire_route_async(candidates, priority)
+        return AdmissionTicket(route, candidates[candidates.index((route.provider, route.model)) + 1 :])
+
+    def _admit_sync(
+        self,
+        trace: RequestTrace,
+        session_id: str,
+        provider: Optional[str],
+        model: Optional[str],
+        priority: Priority,
+        ticket: Optional[AdmissionTicket],
+    ) -> Tuple[_Route, List[Tuple[str, Optional[str]]]]:
+        if ticket is not None:
+            return ticket.take()
+        provider_key, model_name = self.resolve_provider(session_id, provider, model)
+        candidates = self._candidates(provider_key, model_name)
+        with trace.span("admission"):
+            route = self._acquire_route(candidates, priority)
+        return route, candidates[candidates.index((route.provider, route.model)) + 1 :]
+
+    def provider(self, provider_key: str) -> LLMStreamingProvider:
+        """The provider instance for `provider_key`, built on first use (raises ProviderError)."""
+        return self._providers.get(provider_key)
+
+    def register_provider(self, provider_key: str, factory: Callable[[], LLMStreamingProvider]) -> None:
+        """Add or replace a provider, e.g. a local stub for benchmarks."""
+        self._providers.register(provider_key, factory)
+
+    def breaker(self, provider_key: str) -> CircuitBreaker:
+        def health_check() -> None:
+            # Probing an unbuilt provider builds it; a failed build counts as a failed probe
+            check = getattr(self._providers.get(provider_key), "health_check", None)
+            if check is not None:
+                check()
+
+        return breakers.get(provider_key, health_check)
+
+    def _candidates(self, provider_key: str, model_name: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+        """The requested provider/model followed by its fallback chain, skipping unknown providers."""
+        candidates = [(provider_key, model_name)]
+        for fallback in parse_fallbacks(settings.provider_fallbacks).get(provider_key, []):
+            if fallback[0] in self._providers and fallback not in candidates:
+                candidates.append(fallback)
+        return candidates
+
+    def _acquire_route(
+        self,
+        candidates: List[Tuple[str, Optional[str]]],
+        priority: Priority,
+        failed_from: Optional[str] = None,
+    ) -> _Route:
+        """Bind to the first candidate whose breaker is closed (or trialling) and that admits us."""
+        rejections = _Rejections(failed_from)
+        for provider_key, model_name in candidates:
+            bound = self._bind(provider_key, rejections)
+            if bound is None:
+                continue
+            try:
+                slot = admission.acquire(provider_key, model_name, priority)
+            except AdmissionRejected as exc:
+                bound[0].release_trial()
+                rejections.add(provider_key, exc, "overloaded")
+                continue
+            rejections.bound(provider_key)
+            return _Route(provider_key, model_name, bound[1], bound[0], slot)
+        assert rejections.first is not None  # candidates is never empty
+        raise rejections.first
+
+    async def _acquire_route_async(
+        self,
+        candidates: List[Tuple[str, Optional[str]]],
+        priority: Priority,
+    ) -> _Route:
+        """`_acquire_route`, waiting for slots on the event loop."""
+        rejections = _Rejections(None)
+        for provider_key, model_name in candidates:
+            bound = self._bind(provider_key, rejections)
+            if bound is None:
+                continue
+            try:
+                slot = await admission.acquire_async(provider_key, model_name, priority)
+            except AdmissionRejected as exc:
+                bound[0].release_trial()
+                rejections.add(provider_key, exc, "overloaded")
+                continue
+            except BaseException:
+                bound[0].release_trial()
+                raise
+            rejections.bound(provider_key)
+            return _Route(provider_key, model_name, bound[1], bound[0], slot)
+        assert rejections.first is not None  # candidates is never empty
+        raise rejections.first
+
+    def _bind(
+        self, provider_key: str, rejections: _Rejections
+    ) -> Optional[Tuple[CircuitBreaker, LLMStreamingProvider]]:
+        """The candidate's breaker and provider, or None (recorded in `rejections`) when it is unusable."""
+        breaker = self.breaker(provider_key)
+        if not breaker.allow_request():
+            rejections.add(
+                provider_key, AdmissionRejected(provider_key, 503, breaker.retry_after(), "circuit open"), "circuit_open"
+            )
+            return None
+        try:
+            llm = self._providers.get(provider_key)
+        except ProviderError as exc:
+            breaker.record_failure(reason="unavailable")
+            rejections.add(provider_key, exc, "unavailable")
+            return None
+        return breaker, llm
+
+    @staticmethod
+    def _abandon(current: List[_Route], started_flag: List[bool]) -> None:
+        # A started generator releases its slot itself when closed, possibly later (hedging)
+        if not started_flag[0]:
+            current[0].breaker.release_trial()
+            current[0].slot.release()
+
+    @staticmethod
+    def _release_side(pieces: Iterable[str], side: int, route: _Route) -> None:
+        # A hedged side's provider call runs on its own thread and outlives cancellation
+        # until its next chunk; keep the slot until the call has really stopped
+        if isinstance(pieces, HedgedStream):
+            pieces.release_when_done(side, route.slot.release)
+        else:
+            route.slot.release()
+
+    def _open_stream(
+        self,
+        route: _Route,
+        fallbacks: List[Tuple[str, Optional[str]]],
+        hedges: List[_Route],
+        messages: List[PromptMessage],
+        temperature: float,
+        priority: Priority,
+    ) -> Iterable[str]:
+        """Start streaming from `route`, racing the first fallback against it when hedging is on.
+
+        A hedge route, once acquired, is appended to `hedges` so the caller can settle it.
+        """
+        def opener(target: _Route) -> Callable[[], Iterable[str]]:
+            return lambda: target.llm.stream_messages(messages, model=target.model, temperature=temperature)
+
+        if not settings.hedge_enabled or not fallbacks:
+            return opener(route)()
+
+        def start_hedge() -> Optional[Callable[[], Iterable[str]]]:
+            try:
+                hedge = self._acquire_route(fallbacks[:1], priority)
+            except (AdmissionRejected, ProviderError):
+                return None
+            hedges.append(hedge)
+            return opener(hedge)
+
+        return HedgedStream(
+            opener(route),
+            start_hedge,
+            delay=first_chunk_latency.hedge_delay(route.provider, route.model),
+            provider=route.provider,
+            budget=hedge_budget,
+        )
+
+    @staticmethod
+    def _settle_race(pieces: Iterable[str], primary: _Route, hedges: List[_Route]) -> _Route:
+        """Return the route that won a hedged race, releasing the loser's slot and breaker trial."""
+        if not hedges:
+            return primary
+        hedge_won = getattr(pieces, "winner", PRIMARY) == HEDGE
+        winner, loser = (hedges[0], primary) if hedge_won else (primary, hedges[0])
+        loser_side = PRIMARY if hedge_won else HEDGE
+        if loser_side in getattr(pieces, "errors", {}):
+            loser.breaker.record_failure()
+        else:
+            loser.breaker.release_trial()
+        Orchestrator._release_side(pieces, loser_side, loser)
+        return winner
+
+    @staticmethod
+    def _drop_hedges(pieces: Iterable[str], hedges: List[_Route]) -> None:
+        for hedge in hedges:
+            if HEDGE in getattr(pieces, "errors", {}):
+                hedge.breaker.record_failure()
+            else:
+                hedge.breaker.release_trial()
+            Orchestrator._release_side(pieces, HEDGE, hedge)
+
+    def _prepare_turn(
+        self, trace: RequestTrace, session_id: str, prompt: str, chat_id: Optional[int]
+    ) -> Tuple[int, List[PromptMessage]]:
+        """Create the chat if needed, title it, build the prompt and persist the user's message."""
         # Ensure chat exists if chat_id is provided as None
         db_chat_id: Optional[int] = chat_id
         if db_chat_id is None:
-            with SessionLocal() as db:
+            with trace.span("db_chat"), SessionLocal() as db:
                 chat = Chat(session_id=session_id, title=DEFAULT_CHAT_TITLE)
                 db.add(chat)
                 db.commit()
                 db.refresh(chat)
                 db_chat_id = chat.id
 
-        # If this is the first message in the chat, set a dynamic title from user prompt
-        with SessionLocal() as db:
-            msg_count = db.query(Message).filter(Message.chat_id == db_chat_id).count()
-            if msg_count == 0:
-                chat_row = db.get(Chat, db_chat_id)
-                if chat_row is not None:
-                    chat_row.title = self._generate_title(prompt)
-                    db.add(chat_row)
-                    db.commit()
+        # If this is the first message in the chat, set a dynamic title from user prompt.
+        # The denormalized message_count makes this a single conditional UPDATE, no COUNT scan.
+        with trace.span("title"), SessionLocal() as db:
+            db.execute(
+                update(Chat)
+                .where(Chat.id == db_chat_id, Chat.message_count == 0)
+                .values(title=self._generate_title(prompt), updated_at=datetime.utcnow())
+            )
+            db.commit()
 
-        composed = f"{system_prompt}\n\n{self._build_prompt(session_id, prompt, chat_id=db_chat_id)}"
+        # Includes the `history` and `rag_*` phases
+        with trace.span("prompt_build"):
+            messages = self._build_messages(session_id, prompt, chat_id=db_chat_id)
 
         # Append the user's prompt to history immediately (both in-memory and DB)
-        context_store.append_history(session_id, role="user", content=prompt)
-        with SessionLocal() as db:
-            db.add(Message(chat_id=db_chat_id, role="user", content=prompt))
-            db.commit()
+        with trace.span("persist_user"):
+            context_store.append_history(session_id, role="user", content=prompt)
+            with SessionLocal() as db:
+                self._add_message(db, db_chat_id, "user", prompt)
+        return db_chat_id, messages
+
+    def _finish_turn(self, trace: RequestTrace, session_id: str, chat_id: int, answer: str, served: _Route) -> None:
+        """Persist the assistant's answer and schedule summarisation with the route that produced it."""
+        with trace.span("persist"):
+            context_store.append_history(session_id, role="assistant", content=answer)
+            with SessionLocal() as db:
+                message_count = self._add_message(db, chat_id, "assistant", answer)
+        # Fold older turns into the rolling summary off the request path
+        summarizer.maybe_schedule(chat_id, message_count, served.llm, served.provider, served.model)
+
+    def _stream_with_slot(
+        self,
+        route: _Route,
+        *,
+        trace: RequestTrace,
+        fallbacks: List[Tuple[str, Optional[str]]],
+        priority: Priority,
+        session_id: str,
+        prompt: str,
+        chat_id: Optional[int],
+        temperature: float,
+    ) -> ChatStream:
+        db_chat_id, messages = self._prepare_turn(trace, session_id, prompt, chat_id)
+
+        # Stream the assistant response; buffer to append to history at the end and persist.
+        # `current` always holds the route being streamed so cleanup releases the right slot.
+        current = [route]
+        started_flag = [False]
 
-        # Stream the assistant response; buffer to append to history at the end and persist
         def iterator():
+            started_flag[0] = True
+            slot_handed_off = False
             assistant_full: list[str] = []
-            for piece in llm.stream_text(composed, model=model_name, temperature=temperature):
-                assistant_full.append(piece)
-                yield piece
-            full = "".join(assistant_full)
-            context_store.append_history(session_id, role="assistant", content=full)
-            with SessionLocal() as db:
-                db.add(Message(chat_id=db_chat_id, role="assistant", content=full))
-                db.commit()
+            remaining = list(fallbacks)
+            meter = StreamMeter(prompt_chars=sum(len(m.content) for m in messages))
+            try:
+                while True:
+                    active = current[0]
+                    started = time.perf_counter()
+                    first_chunk = True
+                    hedges: List[_Route] = []
+                    pieces = self._open_stream(active, remaining, hedges, messages, temperature, priority)
+                    try:
+                        for piece in pieces:
+                            if first_chunk:
+                                first_chunk = False
+                                active = current[0] = self._settle_race(pieces, active, hedges)
+                                ttft = getattr(pieces, "first_chunk_seconds", None) or time.perf_counter() - started
+                                trace.add("first_token", started, ttft)
+                                active.breaker.record_success(ttft)
+                                first_chunk_latency.observe(active.provider, active.model, ttft)
+                            meter.chunk(piece, active.provider, active.model)
+                            assistant_full.append(piece)
+                            yield piece
+                    except GeneratorExit:
+                        if isinstance(pieces, HedgedStream):
+                            pieces.close()
+                            # The active side's pump may still be waiting on the provider
+                            side = PRIMARY if pieces.winner is None else pieces.winner
+                            self._release_side(pieces, side, active)
+                            slot_handed_off = True
+                        if first_chunk:
+                            active.breaker.release_trial()
+                            self._drop_hedges(pieces, hedges)
+                        raise
+                    except Exception as exc:
+                        if first_chunk:
+                            self._drop_hedges(pieces, hedges)
+                            remaining = remaining[len(hedges) :]
+                        active.breaker.record_failure()
+                        # Once text has reached the client a switch would splice two answers
+                        if not first_chunk or not remaining:
+                            raise
+                        active.slot.release()
+                        try:
+                            current[0] = self._acquire_route(remaining, priority, failed_from=active.provider)
+                        except (AdmissionRejected, ProviderError):
+                            raise exc
+                        remaining = remaining[remaining.index((current[0].provider, current[0].model)) + 1 :]
+                        continue
+                    if first_chunk:
+                        active = current[0] = self._settle_race(pieces, active, hedges)
+                        active.breaker.record_success(time.perf_counter() - started)
+                    break
+            except GeneratorExit:
+                meter.finish(current[0].provider, current[0].model, "cancelled")
+                raise
+            except BaseException:
+                meter.finish(current[0].provider, current[0].model, "error")
+                raise
+            finally:
+                if not slot_handed_off:
+                    current[0].slot.release()
+            meter.finish(current[0].provider, current[0].model, "completed")
+            if meter.first_chunk_at is not None:
+                trace.add("generation", meter.first_chunk_at, meter.last_chunk_at - meter.first_chunk_at)
+            self._finish_turn(trace, session_id, db_chat_id, "".join(assistant_full), current[0])
 
-        # Return an iterator but attach the resolved chat_id as an attribute for the caller to read if needed
-        iterator.chat_id = db_chat_id
-        return iterator()
+        chunks = iterator()
+        # A generator that is dropped before its first step never runs its finally block
+        weakref.finalize(chunks, self._abandon, current, started_flag)
+        # Expose the resolved chat_id alongside the chunks for callers that created a new chat
+        return ChatStream(chunks, db_chat_id)
 
 
 orchestrator = Orchestrator()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterator
+
+from app.core.settings import settings
+from app.services.llm_base import LLMStreamingProvider, ProviderError
+
+
+def _gemini() -> LLMStreamingProvider:
+    from app.services.providers_gemini import GeminiProvider
+
+    return GeminiProvider()
+
+
+def _ollama() -> LLMStreamingProvider:
+    from app.services.providers_ollama import OllamaProvider
+
+    return OllamaProvider()
+
+
+def _openai() -> LLMStreamingProvider:
+    from app.services.providers_openai import OpenAIProvider
+
+    return OpenAIProvider()
+
+
+class ProviderRegistry:
+    """Provider factories keyed by name; each provider is built on first use and cached.
+
+    Factories import their SDK lazily, so importing the app does not pay for clients that
+    are never used, and a provider that cannot be built (missing package or API key)
+    only fails the requests that ask for it. A failed build is retried on the next call.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], LLMStreamingProvider]]) -> None:
+        self._factories = dict(factories)
+        self._instances: Dict[str, LLMStreamingProvider] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __getitem__(self, name: str) -> LLMStreamingProvider:
+        return self.get(name)
+
+    def get(self, name: str) -> LLMStreamingProvider:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                try:
+                    instance = self._factories[name]()
+                except ProviderError:
+                    raise
+                except Exception as exc:
+                    raise ProviderError(f"{name} provider is unavailable: {exc}") from exc
+                self._instances[name] = instance
+        return instance
+
+    def register(self, name: str, factory: Callable[[], LLMStreamingProvider]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+
+def _replaying(name: str) -> Callable[[], LLMStreamingProvider]:
+    def build() -> LLMStreamingProvider:
+        from app.services.provider_replay import ReplayProvider
+
+        return ReplayProvider(settings.llm_replay_path, name, settings.llm_replay_time_scale)
+
+    return build
+
+
+def _recording(name: str, factory: Callable[[], LLMStreamingProvider]) -> Callable[[], LLMStreamingProvider]:
+    def build() -> LLMStreamingProvider:
+        from app.services.provider_replay import RecordingProvider
+
+        return RecordingProvider(factory(), name, settings.llm_record_path)
+
+    return build
+
+
+def default_registry() -> ProviderRegistry:
+    """The built-in providers; with LLM_REPLAY_PATH all of them replay recordings instead,
+    and with LLM_RECORD_PATH their streams are recorded."""
+    factories: Dict[str, Callable[[], LLMStreamingProvider]] = {"gemini": _gemini, "ollama": _ollama, "openai": _openai}
+    if settings.llm_replay_path:
+        factories = {name: _replaying(name) for name in factories}
+    elif settings.llm_record_path:
+        factories = {name: _recording(name, factory) for name, factory in factories.items()}
+    return ProviderRegistry(factories)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import itertools
+import json
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from app.services.llm_base import LLMStreamingProvider, PromptMessage, ProviderError, render_messages
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    # Appending to a .gz file adds a gzip member; readers decompress all members in sequence
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+class RecordingProvider(LLMStreamingProvider):
+    """Wraps a provider and appends each completed stream to an NDJSON file.
+
+    A record holds the provider/model, a hash of the (flattened) prompt, the chunks, and
+    the delay before each chunk in milliseconds (the first one is time to first chunk).
+    A `complete` call is recorded as a single chunk delayed by the call's latency.
+    Prompts themselves are not stored. Other attributes are forwarded to the wrapped provider.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, inner: LLMStreamingProvider, provider: str, path: str) -> None:
+        self._inner = inner
+        self._provider = provider
+        self._path = Path(path)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+    def stream_text(self, prompt: str, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        chunks = self._inner.stream_text(prompt, model=model, temperature=temperature)
+        return self._record(chunks, prompt, model)
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        chunks = self._inner.stream_messages(messages, model=model, temperature=temperature)
+        return self._record(chunks, render_messages(messages), model)
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        started = time.perf_counter()
+        text = self._inner.complete(messages, model=model, temperature=temperature)
+        delay = round((time.perf_counter() - started) * 1000, 2)
+        self._write(render_messages(messages), model, [text], [delay])
+        return text
+
+    def _record(self, chunks: Iterable[str], prompt: str, model: Optional[str]) -> Iterator[str]:
+        texts: List[str] = []
+        delays: List[float] = []
+        last = time.perf_counter()
+        try:
+            for chunk in chunks:
+                now = time.perf_counter()
+                texts.append(chunk)
+                delays.append(round((now - last) * 1000, 2))
+                yield chunk
+                # Time spent in the consumer between chunks is not part of the provider's timing
+                last = time.perf_counter()
+        finally:
+            # Closing early must still cancel the wrapped provider's call
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        self._write(prompt, model, texts, delays)
+
+    def _write(self, prompt: str, model: Optional[str], texts: List[str], delays: List[float]) -> None:
+        record = {
+            "provider": self._provider,
+            "model": model,
+            "prompt_hash": prompt_hash(prompt),
+            "chunks": texts,
+            "delays_ms": delays,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock, _open(self._path, "a") as fh:
+            fh.write(line)
+
+
+class ReplayProvider(LLMStreamingProvider):
+    """Serves recorded streams with their original inter-chunk timing, scaled by `time_scale`.
+
+    A request replays the recording for the same prompt hash when there is one, otherwise
+    the provider's recordings (or all recordings) in turn, so load tests keep the shape of
+    real traffic even when prompts differ.
+    """
+
+    def __init__(self, path: str, provider: str, time_scale: float = 1.0) -> None:
+        self._provider = provider
+        self._time_scale = max(time_scale, 0.0)
+        records = _load(Path(path))
+        if not records:
+            raise ProviderError(f"no recordings in {path}")
+        own = [r for r in records if r.get("provider") == provider] or records
+        self._by_hash: Dict[str, Dict[str, Any]] = {r["prompt_hash"]: r for r in own}
+        self._cycle = itertools.cycle(own)
+        self._lock = threading.Lock()
+
+    def stream_text(self, prompt: str, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        return self._replay(self._pick(prompt))
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        return self._replay(self._pick(render_messages(messages)))
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        # The whole recorded generation time, then the whole text at once
+        record = self._pick(render_messages(messages))
+        if self._time_scale:
+            time.sleep(sum(record["delays_ms"]) / 1000 * self._time_scale)
+        return "".join(record["chunks"])
+
+    def _pick(self, prompt: str) -> Dict[str, Any]:
+        record = self._by_hash.get(prompt_hash(prompt))
+        if record is not None:
+            return record
+        with self._lock:
+            return next(self._cycle)
+
+    def _replay(self, record: Dict[str, Any]) -> Iterator[str]:
+        for chunk, delay_ms in zip(record["chunks"], record["delays_ms"]):
+            if self._time_scale and delay_ms:
+                time.sleep(delay_ms / 1000 * self._time_scale)
+            yield chunk
+
+
+def _load(path: Path) -> List[Dict[str, Any]]:
+    try:
+        with _open(path, "r") as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+    except OSError as exc:
+        raise ProviderError(f"cannot read recordings from {path}: {exc}") from exc
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from typing import Iterable, Optional, Sequence
 
 from app.services.gemini_service import GeminiService
-from app.services.llm_base import LLMStreamingProvider
+from app.services.llm_base import LLMStreamingProvider, PromptMessage
 
 
 class GeminiProvider(LLMStreamingProvider):
@@ -22,3 +22,33 @@ class GeminiProvider(LLMStreamingProvider):
             model_name=model,
             temperature=temperature,
         )
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        return self._service.stream_messages_response(
+            messages,
+            model_name=model,
+            temperature=temperature,
+        )
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        return self._service.complete_messages_response(
+            messages,
+            model_name=model,
+            temperature=temperature,
+        )
+
+    def health_check(self) -> None:
+        if self._service.client is not None:
+            self._service.client.models.list()
@@ -3,9 +3,14 @@ from __future__ import annotations
 from typing import Iterable, Optional
 
 from app.core.settings import settings
+from app.services.http_clients import ClientCache, key_fingerprint, temperature_class
 from app.services.llm_base import LLMStreamingProvider
 
 
+_gemini_clients = ClientCache("langchain_gemini")
+_ollama_clients = ClientCache("langchain_ollama")
+
+
 class LangchainGeminiProvider(LLMStreamingProvider):
     """Stream with Google Gemini via LangChain."""
 
@@ -25,10 +30,11 @@ class LangchainGeminiProvider(LLMStreamingProvider):
         if not api_key:
             raise RuntimeError("Gemini API key is not configured")
 
-        llm = ChatGoogleGenerativeAI(
-            model=model or settings.gemini_model,
-            google_api_key=api_key,
-            temperature=temperature,
+        model_name = model or settings.gemini_model
+        temperature = temperature_class(temperature)
+        llm = _gemini_clients.get(
+            (model_name, key_fingerprint(api_key), temperature),
+            lambda: ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key, temperature=temperature),
         )
 
         for chunk in llm.stream(prompt):
@@ -53,7 +59,12 @@ class LangchainOllamaProvider(LLMStreamingProvider):
         except Exception as exc:  # pragma: no cover - import guard
             raise RuntimeError("LangChain ChatOllama not available") from exc
 
-        llm = ChatOllama(model=model or "llama3.2", temperature=temperature)
+        model_name = model or "llama3.2"
+        temperature = temperature_class(temperature)
+        llm = _ollama_clients.get(
+            (model_name, temperature),
+            lambda: ChatOllama(model=model_name, temperature=temperature),
+        )
         for chunk in llm.stream(prompt):
             text = getattr(chunk, "content", None)
             if isinstance(text, str) and text:
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Iterable, Iterator, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence
 
 import ollama
 
-from app.services.llm_base import LLMStreamingProvider
+from app.services.http_clients import httpx_client_kwargs
+from app.services.llm_base import LLMStreamingProvider, PromptMessage, ProviderError
+from app.services.ollama_residency import residency
 
 
 class OllamaProvider(LLMStreamingProvider):
@@ -19,7 +21,7 @@ class OllamaProvider(LLMStreamingProvider):
     def __init__(self, host: Optional[str] = None, default_model: Optional[str] = None) -> None:
         self.host = host or os.getenv("OLLAMA_HOST") or "http://localhost:11434"
         self._default_model = default_model or os.getenv("OLLAMA_MODEL") or "llama3.2"
-        self._client = ollama.Client(host=self.host)
+        self._client = ollama.Client(host=self.host, **httpx_client_kwargs("ollama"))
 
     def stream_text(
         self,
@@ -34,7 +36,8 @@ class OllamaProvider(LLMStreamingProvider):
             stream = self._client.generate(
                 model=selected_model,
                 prompt=prompt,
-                options={"temperature": temperature},
+                options=residency.options(temperature),
+                keep_alive=residency.keep_alive(selected_model),
                 stream=True,
             )
             for part in stream:
@@ -42,8 +45,82 @@ class OllamaProvider(LLMStreamingProvider):
                 if text:
                     for token in self._word_tokens(text):
                         yield token
+                if part.get("done"):
+                    residency.observe_response(selected_model, part)
         except Exception as exc:
-            yield f"[ollama-error] {exc}"
+            raise ProviderError(f"ollama: {exc}") from exc
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        """Stream via the chat API.
+
+        The server keeps the KV cache of the previous prompt for a loaded model and only
+        prefills the part that differs, so sending the same system/context/history
+        messages turn after turn (and keeping the model resident) makes prefill cost
+        track the new turn rather than the whole conversation.
+        """
+        selected_model = model or self._default_model
+        try:
+            stream = self._client.chat(
+                model=selected_model,
+                messages=self._chat_messages(messages),
+                options=residency.options(temperature),
+                keep_alive=residency.keep_alive(selected_model),
+                stream=True,
+            )
+            for part in stream:
+                message = part.get("message")
+                text = (message.get("content") if message else "") or ""
+                if text:
+                    for token in self._word_tokens(text):
+                        yield token
+                if part.get("done"):
+                    residency.observe_response(selected_model, part)
+        except Exception as exc:
+            raise ProviderError(f"ollama: {exc}") from exc
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        """One non-streaming chat call; same messages, options and keep_alive as `stream_messages`."""
+        selected_model = model or self._default_model
+        try:
+            response = self._client.chat(
+                model=selected_model,
+                messages=self._chat_messages(messages),
+                options=residency.options(temperature),
+                keep_alive=residency.keep_alive(selected_model),
+                stream=False,
+            )
+        except Exception as exc:
+            raise ProviderError(f"ollama: {exc}") from exc
+        residency.observe_response(selected_model, response)
+        message = response.get("message")
+        return (message.get("content") if message else "") or ""
+
+    @staticmethod
+    def _chat_messages(messages: Sequence[PromptMessage]) -> List[dict]:
+        return [
+            # Context blocks go in as user turns; many model templates honour only one system message
+            {"role": "user" if m.role == "context" else m.role, "content": m.content}
+            for m in messages
+        ]
+
+    @property
+    def client(self) -> ollama.Client:
+        return self._client
+
+    def health_check(self) -> None:
+        self._client.list()
 
     @staticmethod
     def _word_tokens(text: str) -> Iterator[str]:
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Sequence
 
-from app.services.llm_base import LLMStreamingProvider
+from app.services.http_clients import httpx_client_kwargs
+from app.services.llm_base import LLMStreamingProvider, PromptMessage, ProviderError, prefix_fingerprint
+from app.services.llm_metrics import record_prompt_usage
 from app.core.settings import settings
 
 try:
-    from openai import OpenAI
+    from openai import DefaultHttpxClient, OpenAI
 except Exception:  # pragma: no cover
     OpenAI = None  # type: ignore
 
@@ -24,7 +26,8 @@ class OpenAIProvider(LLMStreamingProvider):
         api_key = getattr(settings, "openai_api_key", None)
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY not configured. Add to backend/app/.env")
-        self._client = OpenAI(api_key=api_key)
+        # One pooled keep-alive client per provider instance, reused by every request
+        self._client = OpenAI(api_key=api_key, http_client=DefaultHttpxClient(**httpx_client_kwargs("openai")))
         self._default_model = getattr(settings, "openai_model", "gpt-4o-mini")
 
     def stream_text(
@@ -54,4 +57,76 @@ class OpenAIProvider(LLMStreamingProvider):
                 if isinstance(text, str) and text:
                     yield text
         except Exception as exc:
-            yield f"[openai-error] {exc}"
+            raise ProviderError(f"openai: {exc}") from exc
+
+    def stream_messages(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> Iterable[str]:
+        """Stream a structured prompt as native chat messages.
+
+        OpenAI caches prompt prefixes automatically; the system and context blocks lead
+        the message list unchanged from turn to turn, and `prompt_cache_key` routes
+        requests sharing that prefix to the same cache. Cached-token counts come back in
+        the final usage chunk.
+        """
+        selected_model = model or self._default_model
+        try:
+            stream = self._client.chat.completions.create(
+                model=selected_model,
+                messages=self._chat_messages(messages),
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                prompt_cache_key=prefix_fingerprint(messages),
+            )
+            for chunk in stream:
+                self._record_usage(selected_model, getattr(chunk, "usage", None))
+                if not chunk or not chunk.choices:
+                    continue
+                text = getattr(chunk.choices[0].delta, "content", None)
+                if isinstance(text, str) and text:
+                    yield text
+        except Exception as exc:
+            raise ProviderError(f"openai: {exc}") from exc
+
+    def complete(
+        self,
+        messages: Sequence[PromptMessage],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+    ) -> str:
+        """One non-streaming chat completion with the same message layout and cache key."""
+        selected_model = model or self._default_model
+        try:
+            response = self._client.chat.completions.create(
+                model=selected_model,
+                messages=self._chat_messages(messages),
+                temperature=temperature,
+                prompt_cache_key=prefix_fingerprint(messages),
+            )
+        except Exception as exc:
+            raise ProviderError(f"openai: {exc}") from exc
+        self._record_usage(selected_model, response.usage)
+        return (response.choices[0].message.content if response.choices else None) or ""
+
+    @staticmethod
+    def _chat_messages(messages: Sequence[PromptMessage]) -> List[dict]:
+        return [
+            # Document context is user-supplied material, so it is not given system authority
+            {"role": "user" if m.role == "context" else m.role, "content": m.content}
+            for m in messages
+        ]
+
+    @staticmethod
+    def _record_usage(model: str, usage: object) -> None:
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            record_prompt_usage("openai", model, usage.prompt_tokens, getattr(details, "cached_tokens", None))
+
+    def health_check(self) -> None:
+        self._client.models.list()
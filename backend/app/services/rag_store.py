@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
-
-from langchain_community.vectorstores.faiss import FAISS
-from langchain_core.documents import Document
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from app.core.settings import settings
+from app.core.tracing import current_trace
+from app.services.http_clients import ClientCache, key_fingerprint
+
+if TYPE_CHECKING:  # LangChain, FAISS and the embedding client are imported on first use
+    from langchain_community.vectorstores.faiss import FAISS
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 
 @dataclass
@@ -15,16 +17,25 @@ class SessionIndex:
     store: Optional[FAISS] = None
 
 
+EMBEDDING_MODEL = "text-embedding-004"
+
+
 class RAGStore:
     def __init__(self) -> None:
         self._sessions: Dict[str, SessionIndex] = {}
+        self._embedding_clients = ClientCache("embeddings", max_size=4)
 
     def _embeddings(self) -> Optional[GoogleGenerativeAIEmbeddings]:
         api_key = settings.gemini_api_key
         if not api_key:
             return None
         try:
-            return GoogleGenerativeAIEmbeddings(google_api_key=api_key, model="text-embedding-004")
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+            return self._embedding_clients.get(
+                (EMBEDDING_MODEL, key_fingerprint(api_key)),
+                lambda: GoogleGenerativeAIEmbeddings(google_api_key=api_key, model=EMBEDDING_MODEL),
+            )
         except Exception:
             return None
 
@@ -39,6 +50,9 @@ class RAGStore:
         if embs is None:
             # No embeddings capability; skip indexing
             return False
+        from langchain_community.vectorstores.faiss import FAISS
+        from langchain_core.documents import Document
+
         docs = [Document(page_content=chunk) for chunk in self._chunk_text(text)]
         if not docs:
             return False
@@ -52,8 +66,12 @@ class RAGStore:
         index = self._sessions.get(session_id)
         if not index or not index.store or not query.strip():
             return []
+        trace = current_trace()
         try:
-            docs_with_scores = index.store.similarity_search_with_score(query, k=k)
+            with trace.span("rag_embed"):
+                embedding = index.store.embedding_function.embed_query(query)
+            with trace.span("rag_search"):
+                docs_with_scores = index.store.similarity_search_with_score_by_vector(embedding, k=k)
             return [(doc.page_content, float(score)) for doc, score in docs_with_scores]
         except Exception:
             return []
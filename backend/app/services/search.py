@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import encode_cursor
+from app.models import FTS_CONFIG, Chat, Message
+
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# External-content FTS5 table maintained by triggers (see app.models)
+_messages_fts = table("messages_fts", column("rowid"))
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term so user input can never be parsed as FTS5 syntax (terms are ANDed)."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def _postgres_statement(query: str):
+    tsquery = func.websearch_to_tsquery(FTS_CONFIG, query)
+    document = func.to_tsvector(FTS_CONFIG, Message.content)
+    score = func.ts_rank_cd(document, tsquery)
+    highlight = func.ts_headline(
+        FTS_CONFIG,
+        Message.content,
+        tsquery,
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=30",
+    )
+    return [document.op("@@")(tsquery)], score, highlight
+
+
+def _sqlite_statement(query: str):
+    fts = literal_column("messages_fts")
+    # bm25() is lower-is-better; negate it so both backends sort by score DESC
+    score = -func.bm25(fts)
+    highlight = func.snippet(fts, 0, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 24)
+    criteria = [fts.op("MATCH")(_fts5_query(query)), _messages_fts.c.rowid == Message.id]
+    return criteria, score, highlight
+
+
+async def search_messages(
+    db: AsyncSession,
+    *,
+    session_id: str,
+    query: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Ranked full-text search over a session's messages, paged by (score, id)."""
+    if db.get_bind().dialect.name == "sqlite":
+        criteria, score, highlight = _sqlite_statement(query)
+    else:
+        criteria, score, highlight = _postgres_statement(query)
+
+    stmt = select(
+        Message.id,
+        Message.chat_id,
+        Chat.title,
+        Message.role,
+        Message.created_at,
+        score.label("score"),
+        highlight.label("highlight"),
+    ).join(Chat, Chat.id == Message.chat_id)
+    stmt = stmt.where(Chat.session_id == session_id, *criteria)
+    if after is not None:
+        stmt = stmt.where(tuple_(score, Message.id) < tuple_(*after))
+    stmt = stmt.order_by(score.desc(), Message.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(float(rows[-1].score), rows[-1].id)
+    items = [
+        {
+            "message_id": r.id,
+            "chat_id": r.chat_id,
+            "chat_title": r.title,
+            "role": r.role,
+            "created_at": r.created_at.isoformat(),
+            "score": float(r.score),
+            "highlight": r.highlight,
+        }
+        for r in rows
+    ]
+    return items, next_cursor
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import select, update
+
+from app.core.db import SessionLocal
+from app.core.settings import settings
+from app.models import Chat, Message
+from app.services.admission import AdmissionRejected, Priority, admission
+from app.services.llm_base import LLMStreamingProvider
+
+
+logger = logging.getLogger("app.summarizer")
+
+SUMMARY_RUNS = Counter(
+    "chat_summary_runs_total",
+    "Rolling summary jobs by outcome",
+    ["outcome"],  # updated | skipped | failed | shed
+)
+SUMMARY_DURATION = Histogram(
+    "chat_summary_duration_seconds",
+    "Wall time of a background summarization job",
+    buckets=(0.5, 1, 2, 5, 10, 20, 40, 80),
+)
+SUMMARY_AGE_MESSAGES = Histogram(
+    "chat_summary_age_messages",
+    "Messages sent verbatim after the summary when a prompt is built",
+    buckets=(0, 2, 4, 6, 8, 12, 16, 24, 32, 64),
+)
+SUMMARY_AGE_SECONDS = Histogram(
+    "chat_summary_age_seconds",
+    "Age of the rolling summary when a prompt is built",
+    buckets=(1, 10, 60, 300, 900, 3600, 6 * 3600, 24 * 3600),
+)
+SUMMARY_TOKENS_SAVED = Counter(
+    "chat_summary_prompt_tokens_saved_total",
+    "Estimated prompt tokens saved by sending the summary instead of the turns it replaces",
+)
+
+
+def format_turns(messages: list[Message]) -> str:
+    return "\n".join(f"{m.role.capitalize()}: {m.content}" for m in messages)
+
+
+class ConversationSummarizer:
+    """Fold older chat turns into a running summary stored on the Chat row.
+
+    Jobs run on a small background executor so the request path only pays for
+    scheduling; at most one job per chat is in flight.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summarizer")
+        self._in_flight: set[int] = set()
+        self._lock = threading.Lock()
+
+    def maybe_schedule(
+        self,
+        chat_id: int,
+        message_count: int,
+        llm: LLMStreamingProvider,
+        provider: str,
+        model: Optional[str],
+    ) -> bool:
+        """Schedule a summary refresh after every `summary_every_n_turns` assistant turns."""
+        every = settings.summary_every_n_turns
+        if every <= 0:
+            return False
+        assistant_turns = message_count // 2
+        if assistant_turns == 0 or assistant_turns % every != 0:
+            return False
+        with self._lock:
+            if chat_id in self._in_flight:
+                return False
+            self._in_flight.add(chat_id)
+        self._executor.submit(self._run, chat_id, llm, provider, model)
+        return True
+
+    def _run(self, chat_id: int, llm: LLMStreamingProvider, provider: str, model: Optional[str]) -> None:
+        start = time.perf_counter()
+        try:
+            # Summaries share provider capacity with user traffic, at the lowest priority
+            slot = admission.acquire(provider, model, Priority.BATCH)
+        except AdmissionRejected:
+            outcome = "shed"
+        else:
+            try:
+                outcome = self.summarize(chat_id, llm, model)
+            except Exception:  # noqa: BLE001 - background job; never propagate
+                logger.exception("summary for chat %s failed", chat_id)
+                outcome = "failed"
+            finally:
+                slot.release()
+        with self._lock:
+            self._in_flight.discard(chat_id)
+        SUMMARY_RUNS.labels(outcome=outcome).inc()
+        SUMMARY_DURATION.observe(time.perf_counter() - start)
+
+    def summarize(self, chat_id: int, llm: LLMStreamingProvider, model: Optional[str]) -> str:
+        keep = max(settings.summary_recent_messages, 0)
+        with SessionLocal() as db:
+            chat = db.get(Chat, chat_id)
+            if chat is None:
+                return "skipped"
+            previous_summary = chat.summary or ""
+            upto_id = chat.summary_upto_id
+            pending = list(
+                db.scalars(
+                    select(Message)
+                    .where(Message.chat_id == chat_id, Message.id > upto_id)
+                    .order_by(Message.created_at.asc(), Message.id.asc())
+                )
+            )
+        # Leave the most recent messages out; the prompt sends those verbatim
+        to_fold = pending[:-keep] if keep else pending
+        if not to_fold:
+            return "skipped"
+
+        prompt = self._build_summary_prompt(previous_summary, format_turns(to_fold))
+        summary = "".join(llm.stream_text(prompt, model=model, temperature=0.0)).strip()
+        if not summary:
+            return "failed"
+        summary = summary[: settings.summary_max_chars]
+        folded_chars = sum(len(m.content) for m in to_fold)
+
+        with SessionLocal() as db:
+            # Optimistic: only apply if no other job advanced the summary meanwhile
+            result = db.execute(
+                update(Chat)
+                .where(Chat.id == chat_id, Chat.summary_upto_id == upto_id)
+                .values(
+                    summary=summary,
+                    summary_upto_id=to_fold[-1].id,
+                    summary_source_chars=Chat.summary_source_chars + folded_chars,
+                    summary_updated_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+        return "updated" if result.rowcount else "skipped"
+
+    @staticmethod
+    def _build_summary_prompt(previous_summary: str, new_turns: str) -> str:
+        return (
+            "You maintain a running summary of a conversation between a user and an assistant. "
+            "Merge the new turns into the existing summary. Keep facts, decisions, names, numbers, "
+            "open questions and user preferences; drop pleasantries. Write compact prose or bullets, "
+            f"at most {settings.summary_max_chars} characters. Reply with the updated summary only.\n\n"
+            f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+            f"New turns:\n{new_turns}\n\n"
+            "Updated summary:"
+        )
+
+
+summarizer = ConversationSummarizer()
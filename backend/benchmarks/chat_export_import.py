@@ -0,0 +1,138 @@
+"""Benchmark NDJSON chat export/import on a generated dataset.
+
+Seeds `--chats` chats holding `--messages` messages in total, streams a full export
+to a temporary file, then re-imports it under a separate session id. Reports rows/s,
+bytes written and peak Python heap during each phase, which should stay flat as the
+dataset grows.
+
+Run from backend/ (defaults to a throwaway SQLite file; set DATABASE_URL to use Postgres):
+    python -m benchmarks.chat_export_import --messages 1000000 --chats 10000 [--gzip]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
+_workdir = Path(tempfile.mkdtemp(prefix="chat-bench-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir / 'bench.db'}")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.db import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.models import Chat, Message  # noqa: E402
+from app.services.chat_transfer import export_ndjson, import_ndjson  # noqa: E402
+
+SESSION_ID = "bench-export"
+IMPORT_SESSION_ID = "bench-import"
+
+
+def seed(chats: int, messages: int, batch: int = 20_000) -> None:
+    Base.metadata.create_all(bind=engine)
+    per_chat = max(messages // chats, 1)
+    base = datetime.utcnow() - timedelta(days=30)
+    content = "lorem ipsum dolor sit amet " * 8
+    with SessionLocal() as db:
+        db.execute(
+            insert(Chat),
+            [
+                {
+                    "session_id": SESSION_ID,
+                    "title": f"Chat {i}",
+                    "created_at": base,
+                    "updated_at": base,
+                    "message_count": per_chat,
+                    "last_message_at": base,
+                }
+                for i in range(chats)
+            ],
+        )
+        chat_ids = list(db.scalars(select(Chat.id).where(Chat.session_id == SESSION_ID).order_by(Chat.id)))
+        rows = []
+        for n in range(messages):
+            rows.append({
+                "chat_id": chat_ids[n // per_chat % len(chat_ids)],
+                "role": "user" if n % 2 == 0 else "assistant",
+                "content": content,
+                "created_at": base + timedelta(seconds=n),
+            })
+            if len(rows) >= batch:
+                db.execute(insert(Message), rows)
+                rows.clear()
+        if rows:
+            db.execute(insert(Message), rows)
+        db.commit()
+
+
+async def _export(path: Path, compress: bool) -> int:
+    written = 0
+    with path.open("wb") as fh:
+        async for chunk in export_ndjson(SESSION_ID, compress=compress):
+            fh.write(chunk)
+            written += len(chunk)
+    return written
+
+
+async def _file_chunks(path: Path, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with path.open("rb") as fh:
+        while chunk := fh.read(size):
+            yield chunk
+
+
+async def _measure(label: str, rows: int, coro_factory):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await coro_factory()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8}: {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s), peak heap {peak / 2**20:.1f} MiB")
+    return result
+
+
+async def _transfer(total_rows: int, export_path: Path, compress: bool) -> None:
+    # One event loop for both phases: pooled async connections are bound to the loop that opened them
+    try:
+        written = await _measure("export", total_rows, lambda: _export(export_path, compress))
+        print(f"          {written / 2**20:.1f} MiB written to {export_path}")
+
+        stats = await _measure(
+            "import",
+            total_rows,
+            lambda: import_ndjson(_file_chunks(export_path), compressed=compress, session_id=IMPORT_SESSION_ID),
+        )
+        print(f"          {stats}")
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--chats", type=int, default=10_000)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.chats, args.messages)
+    print(f"    seed: {args.messages} messages in {time.perf_counter() - start:.2f}s ({engine.url.render_as_string()})")
+
+    export_path = _workdir / ("export.ndjson.gz" if args.gzip else "export.ndjson")
+    asyncio.run(_transfer(args.chats + args.messages, export_path, args.gzip))
+
+    with SessionLocal() as db:
+        imported = db.scalar(
+            select(func.count(Message.id)).join(Chat, Chat.id == Message.chat_id).where(Chat.session_id == IMPORT_SESSION_ID)
+        )
+    if imported != args.messages:
+        raise SystemExit(f"expected {args.messages} imported messages, found {imported}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Stress benchmark for the concurrent ContextStore.
+
+Spawns many writer threads that append turns to a small set of shared sessions
+while reader threads poll history and preferences, then verifies that every
+turn landed exactly once and reports append throughput.
+
+Run from backend/:
+    python -m benchmarks.context_store_stress --writers 64 --turns 2000 --sessions 8
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from collections import Counter
+
+from app.services.context_store import ContextStore
+
+
+def run(writers: int, turns: int, sessions: int, readers: int) -> dict:
+    session_ids = [f"bench-{i}" for i in range(sessions)]
+    # Every writer targets every session in round-robin, so each session receives
+    # writers * turns / sessions appends; size the ring buffer to keep them all.
+    per_session = writers * turns // sessions + writers
+    store = ContextStore(history_limit=per_session)
+    start_barrier = threading.Barrier(writers + readers + 1)
+    stop = threading.Event()
+
+    def writer(writer_id: int) -> None:
+        start_barrier.wait()
+        for seq in range(turns):
+            sid = session_ids[(writer_id + seq) % sessions]
+            store.append_history(sid, role="user", content=f"{writer_id}:{seq}")
+
+    def reader() -> None:
+        start_barrier.wait()
+        while not stop.is_set():
+            for sid in session_ids:
+                store.get_history(sid, limit=10)
+                store.get_preferences(sid)
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads + reader_threads:
+        t.start()
+
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for t in reader_threads:
+        t.join()
+
+    seen: Counter[str] = Counter()
+    for sid in session_ids:
+        seen.update(turn.content for turn in store.get_history(sid))
+    expected = {f"{w}:{s}" for w in range(writers) for s in range(turns)}
+    lost = len(expected - seen.keys())
+    duplicated = sum(1 for count in seen.values() if count > 1)
+
+    total = writers * turns
+    return {
+        "appends": total,
+        "lost": lost,
+        "duplicated": duplicated,
+        "seconds": round(elapsed, 4),
+        "appends_per_sec": round(total / elapsed, 1) if elapsed > 0 else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=64)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    result = run(args.writers, args.turns, args.sessions, args.readers)
+    for key, value in result.items():
+        print(f"{key:>16}: {value}")
+    if result["lost"] or result["duplicated"]:
+        raise SystemExit("context store lost or duplicated turns under concurrency")
+
+
+if __name__ == "__main__":
+    main()
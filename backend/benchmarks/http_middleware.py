@@ -0,0 +1,150 @@
+"""Per-request overhead of the HTTP metrics middleware.
+
+Calls a minimal FastAPI app directly over ASGI (no sockets) with no middleware, with
+`RequestMetricsMiddleware`, and with an equivalent `BaseHTTPMiddleware` like the one it
+replaced, for a plain JSON route and a 100-chunk streaming route. Reports microseconds per
+request and the number of `http_requests_total` series created by requests to distinct
+chat ids, which must stay at one per route.
+
+Run from backend/:
+    python -m benchmarks.http_middleware --requests 5000 [--log-sample-rate 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict
+
+
+def _build(variant: str):
+    from fastapi import FastAPI, Request
+    from starlette.responses import StreamingResponse
+
+    from app.core.http_metrics import REQUEST_COUNT, REQUEST_LATENCY, RequestMetricsMiddleware
+
+    app = FastAPI()
+
+    @app.get("/api/chats/{chat_id}/messages")
+    async def messages(chat_id: int) -> dict:
+        return {"chat_id": chat_id, "items": []}
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for i in range(100):
+                yield f"data: {i}\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    if variant == "asgi":
+        app.add_middleware(RequestMetricsMiddleware)
+    elif variant == "base_http":
+        logger = logging.getLogger("app")
+
+        # The previous middleware: raw path labels and a log line per request
+        @app.middleware("http")
+        async def logging_and_metrics_middleware(request: Request, call_next: Callable):
+            start_time = time.perf_counter()
+            response = await call_next(request)
+            duration = time.perf_counter() - start_time
+            path, method, status = request.url.path, request.method, response.status_code
+            REQUEST_COUNT.labels(method=method, path=path, status=str(status)).inc()
+            REQUEST_LATENCY.labels(method=method, path=path).observe(duration)
+            logger.info(f"{method} {path} -> {status} in {duration:.3f}s")
+            return response
+
+    return app
+
+
+async def _call(app, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive() -> dict:
+        # The body once, then block until the response is complete, as a server does;
+        # StreamingResponse listens for the disconnect while it streams
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+
+
+async def _time(app, path_for: Callable[[int], str], requests: int) -> float:
+    for i in range(min(requests // 10, 200)):  # warm-up
+        await _call(app, path_for(i))
+    started = time.perf_counter()
+    for i in range(requests):
+        await _call(app, path_for(i))
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def _series(path_prefix: str) -> int:
+    from app.core.http_metrics import REQUEST_COUNT
+
+    return sum(
+        1
+        for metric in REQUEST_COUNT.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_total") and sample.labels.get("path", "").startswith(path_prefix)
+    )
+
+
+def run(requests: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for variant in ("none", "asgi", "base_http"):
+        app = _build(variant)
+        json_us = asyncio.run(_time(app, lambda i: f"/api/chats/{i}/messages", requests))
+        stream_us = asyncio.run(_time(app, lambda i: "/stream", requests // 10 or 1))
+        results[variant] = {"json_us": round(json_us, 1), "stream_us": round(stream_us, 1)}
+    for variant in ("asgi", "base_http"):
+        results[variant]["json_overhead_us"] = round(results[variant]["json_us"] - results["none"]["json_us"], 1)
+        results[variant]["stream_overhead_us"] = round(results[variant]["stream_us"] - results["none"]["stream_us"], 1)
+    # base_http labels raw paths (one series per chat), the ASGI middleware the template
+    results["series"] = {"template": _series("/api/chats/{"), "raw_paths": _series("/api/chats/") - _series("/api/chats/{")}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--log-sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ["ACCESS_LOG_SAMPLE_RATE"] = str(args.log_sample_rate)
+    # Format log records as the server would, but discard them
+    logging.basicConfig(level=logging.INFO, handlers=[logging.FileHandler(os.devnull)])
+
+    for name, values in run(args.requests).items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""End-to-end load benchmark against a deterministic local stub provider.
+
+Starts the app in a subprocess with a `stub` provider that streams `--stub-tokens`
+tokens at `--stub-rate` tokens/s after `--stub-first-token` seconds, so what is measured
+is the backend's own overhead. Drives `/api/agents/stream`, `/api/agents/message`,
+`/api/files/upload` and `/api/chats/` with `--concurrency` clients each and reports
+requests/s, latency, TTFT and inter-token percentiles, server CPU per streamed token
+and server RSS.
+
+With `--replay recordings.jsonl` the built-in providers replay recorded production
+streams instead (see LLM_RECORD_PATH), keeping real TTFT and chunk timing.
+
+`--json` writes the result as a baseline; `--compare` fails (exit code 1) when a
+later run is worse than a baseline by more than `--tolerance`.
+
+Run from backend/ (defaults to a throwaway SQLite file; set DATABASE_URL to use Postgres):
+    python -m benchmarks.load --requests 200 --concurrency 32 --json load-baseline.json
+    python -m benchmarks.load --compare load-baseline.json --tolerance 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+SCENARIOS = ("stream", "message", "upload", "chats")
+
+# Compared by --compare: (scenario metric path, True if higher is better)
+REGRESSION_KEYS = (
+    ("stream.requests_per_sec", True),
+    ("stream.ttft_ms.p95", False),
+    ("stream.inter_token_ms.p95", False),
+    ("message.requests_per_sec", True),
+    ("message.latency_ms.p95", False),
+    ("message.server_cpu_ms_per_request", False),
+    ("upload.requests_per_sec", True),
+    ("chats.requests_per_sec", True),
+    ("chats.latency_ms.p95", False),
+    ("server.cpu_ms_per_token", False),
+    ("server.max_rss_mb", False),
+)
+
+
+class StubProvider:
+    """Deterministic `LLMStreamingProvider`: fixed tokens at a fixed rate, no network."""
+
+    def __init__(self, tokens: int, rate: float, first_token_seconds: float) -> None:
+        self.tokens = tokens
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.first_token_seconds = first_token_seconds
+
+    def stream_text(self, prompt: str, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        return self._stream()
+
+    def stream_messages(self, messages: Sequence, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        return self._stream()
+
+    def complete(self, messages: Sequence, *, model: Optional[str] = None, temperature: float = 0.3) -> str:
+        time.sleep(self.first_token_seconds + max(self.tokens - 1, 0) * self.interval)
+        return "".join(f"tok{i} " for i in range(self.tokens))
+
+    def _stream(self) -> Iterator[str]:
+        time.sleep(self.first_token_seconds)
+        for i in range(self.tokens):
+            if i and self.interval:
+                time.sleep(self.interval)
+            yield f"tok{i} "
+
+
+def serve(port: int, tokens: int, rate: float, first_token_seconds: float) -> None:
+    """Server side: the real app plus the stub provider and a usage endpoint."""
+    import uvicorn
+
+    from app.main import app
+    from app.services.orchestrator import orchestrator
+
+    orchestrator.register_provider("stub", lambda: StubProvider(tokens, rate, first_token_seconds))
+
+    def usage() -> dict:
+        rusage = resource.getrusage(resource.RUSAGE_SELF)
+        rss_kb = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+        return {"cpu_seconds": rusage.ru_utime + rusage.ru_stime, "max_rss_mb": rss_kb / 1024}
+
+    app.add_api_route("/bench/usage", usage, methods=["GET"], include_in_schema=False)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1] * 1000, 2)}
+
+
+async def _run_clients(requests: int, concurrency: int, one) -> Dict[str, object]:
+    """Run `requests` calls of `one(i)` over `concurrency` workers; returns rps and latency."""
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                await one(i)
+            except Exception:  # noqa: BLE001 - counted, the run continues
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": _percentiles(latencies),
+    }
+
+
+async def _drive(
+    base_url: str, scenarios: Sequence[str], requests: int, concurrency: int, upload_kb: int, provider: str
+) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: dict = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def usage() -> dict:
+            return (await client.get("/bench/usage")).json()
+
+        body = {"prompt": "Summarise the benchmark.", "provider": provider}
+        tokens = 0
+        for scenario in scenarios:
+            before = await usage()
+            if scenario == "stream":
+                ttft: List[float] = []
+                gaps: List[float] = []
+
+                async def one(i: int) -> None:
+                    nonlocal tokens
+                    started = last = time.perf_counter()
+                    async with client.stream("POST", f"/api/agents/stream?session_id=load-{i % concurrency}", json=body) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line == "event: BOT_Response":
+                                now = time.perf_counter()
+                                (gaps if last != started else ttft).append(now - last)
+                                last = now
+                                tokens += 1
+                            elif line.startswith("event: error"):
+                                raise RuntimeError("stream error event")
+
+                result = await _run_clients(requests, concurrency, one)
+                result["ttft_ms"] = _percentiles(ttft)
+                result["inter_token_ms"] = _percentiles(gaps)
+            elif scenario == "message":
+
+                async def one(i: int) -> None:
+                    response = await client.post(f"/api/agents/message?session_id=load-{i % concurrency}", json=body)
+                    response.raise_for_status()
+
+                result = await _run_clients(requests, concurrency, one)
+            elif scenario == "upload":
+                payload = ("lorem ipsum dolor sit amet\n" * (upload_kb * 1024 // 27 + 1)).encode()
+
+                async def one(i: int) -> None:
+                    files = {"file": ("bench.txt", payload, "text/plain")}
+                    response = await client.post(f"/api/files/upload?session_id=upload-{i % concurrency}", files=files)
+                    response.raise_for_status()
+
+                result = await _run_clients(requests, concurrency, one)
+            else:
+
+                async def one(i: int) -> None:
+                    response = await client.get(f"/api/chats/?session_id=load-{i % concurrency}&limit=50")
+                    response.raise_for_status()
+
+                result = await _run_clients(requests, concurrency, one)
+            after = await usage()
+            result["server_cpu_seconds"] = round(after["cpu_seconds"] - before["cpu_seconds"], 3)
+            result["server_cpu_ms_per_request"] = round(result["server_cpu_seconds"] * 1000 / requests, 3)
+            results[scenario] = result
+
+    stream_cpu = results.get("stream", {}).get("server_cpu_seconds", 0.0)
+    results["server"] = {
+        "tokens_streamed": tokens,
+        # Everything the server did for the stream scenario, per SSE content event
+        "cpu_ms_per_token": round(stream_cpu * 1000 / tokens, 4) if tokens else None,
+        "max_rss_mb": round(after["max_rss_mb"], 1),
+    }
+    return results
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("benchmark server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("benchmark server did not become ready")
+
+
+def run(args: argparse.Namespace) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='load-bench-')) / 'bench.db'}")
+    # Let the stub run at the benchmark's concurrency instead of the production limits
+    env.setdefault("ADMISSION_LIMITS", f"{args.provider}={args.concurrency}")
+    if args.replay is not None:
+        env["LLM_REPLAY_PATH"] = str(args.replay.resolve())
+        env["LLM_REPLAY_TIME_SCALE"] = str(args.replay_time_scale)
+    env.setdefault("ADMISSION_MAX_QUEUE", str(args.concurrency * 4))
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    command = [
+        sys.executable, "-m", "benchmarks.load", "--serve", "--port", str(port),
+        "--stub-tokens", str(args.stub_tokens), "--stub-rate", str(args.stub_rate),
+        "--stub-first-token", str(args.stub_first_token),
+    ]
+    process = subprocess.Popen(command, env=env, cwd=Path(__file__).resolve().parents[1])
+    try:
+        _wait_until_ready(base_url, process)
+        results = asyncio.run(
+            _drive(base_url, args.scenarios, args.requests, args.concurrency, args.upload_kb, args.provider)
+        )
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    results["config"] = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "provider": args.provider,
+        "replay": str(args.replay) if args.replay is not None else None,
+        "stub_tokens": args.stub_tokens,
+        "stub_rate": args.stub_rate,
+        "stub_first_token": args.stub_first_token,
+        "database": "postgres" if env["DATABASE_URL"].startswith("postgres") else "sqlite",
+        "python": sys.version.split()[0],
+    }
+    return results
+
+
+def _lookup(result: dict, path: str) -> Optional[float]:
+    value: object = result
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Metrics that regressed by more than `tolerance` (a fraction) against the baseline."""
+    regressions = []
+    for path, higher_is_better in REGRESSION_KEYS:
+        current, previous = _lookup(result, path), _lookup(baseline, path)
+        if current is None or not previous:
+            continue
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{path}: {previous} -> {current} ({change:+.1%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stub-tokens", type=int, default=200)
+    parser.add_argument("--stub-rate", type=float, default=500.0, help="Tokens per second; 0 = as fast as possible")
+    parser.add_argument("--stub-first-token", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--replay", type=Path, help="Serve providers from these recordings instead of the stub")
+    parser.add_argument("--replay-provider", default="gemini", help="Provider to request when replaying")
+    parser.add_argument("--replay-time-scale", type=float, default=1.0)
+    parser.add_argument("--upload-kb", type=int, default=64)
+    parser.add_argument("--json", type=Path, help="Write the result to this file (a baseline)")
+    parser.add_argument("--compare", type=Path, help="Baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.provider = args.replay_provider if args.replay is not None else "stub"
+
+    if args.serve:
+        serve(args.port, args.stub_tokens, args.stub_rate, args.stub_first_token)
+        return
+
+    result = run(args)
+    for scenario in (*args.scenarios, "server"):
+        print(f"{scenario}:")
+        for key, value in result[scenario].items():
+            print(f"  {key:>18}: {value}")
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+    if args.compare is not None:
+        regressions = compare(result, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""CPU cost of answering a non-streaming message: joined stream vs. native completion.
+
+Runs `Orchestrator` in-process against a throwaway SQLite database and a CPU-only stub
+provider (no sleeps) that returns `--tokens` words. The `stream` path is what the message
+endpoints did before: consume `orchestrator.stream`, with the provider splitting its text
+into word tokens (as the Gemini and Ollama providers do) and the endpoint building the
+answer with `+=`. The `complete` path is `orchestrator.complete`, one provider call. Both
+persist the turn the same way. Reports process CPU milliseconds per request.
+
+Run from backend/ (set DATABASE_URL to use Postgres):
+    python -m benchmarks.message_path --requests 300 --tokens 2000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+_workdir = Path(tempfile.mkdtemp(prefix="message-bench-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir / 'bench.db'}")
+os.environ.setdefault("ADMISSION_LIMITS", "stub=4")
+# Keep background summarisation out of the measurement
+os.environ.setdefault("SUMMARY_EVERY_N_TURNS", "1000000")
+
+from app.core.db import Base, engine  # noqa: E402
+from app.services.admission import Priority  # noqa: E402
+from app.services.orchestrator import orchestrator  # noqa: E402
+
+# Same pattern the Gemini and Ollama providers use to split streamed text
+_WORD_TOKENS = re.compile(r"\s+|[^\w\s]+|\w+", re.UNICODE)
+
+
+class CPUStubProvider:
+    """Returns `tokens` words in 20-word API chunks, as fast as the CPU allows."""
+
+    def __init__(self, tokens: int) -> None:
+        words = [f"word{i % 97}," if i % 11 == 10 else f"word{i % 97}" for i in range(tokens)]
+        self.api_chunks = [" ".join(words[i : i + 20]) + " " for i in range(0, tokens, 20)]
+
+    def stream_text(self, prompt: str, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        return self._stream()
+
+    def stream_messages(self, messages: Sequence, *, model: Optional[str] = None, temperature: float = 0.3) -> Iterable[str]:
+        return self._stream()
+
+    def complete(self, messages: Sequence, *, model: Optional[str] = None, temperature: float = 0.3) -> str:
+        return "".join(self.api_chunks)
+
+    def _stream(self) -> Iterator[str]:
+        for chunk in self.api_chunks:
+            for match in _WORD_TOKENS.finditer(chunk):
+                yield match.group(0)
+
+
+def _stream_path(i: int) -> str:
+    full_text = ""
+    for chunk in orchestrator.stream(
+        session_id=f"bench-{i % 8}", prompt="Explain it.", provider="stub", priority=Priority.NON_STREAMING
+    ):
+        full_text += chunk
+    return full_text
+
+
+def _complete_path(i: int) -> str:
+    return orchestrator.complete(
+        session_id=f"bench-{i % 8}", prompt="Explain it.", provider="stub", priority=Priority.NON_STREAMING
+    ).text
+
+
+def run(requests: int, tokens: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    orchestrator.register_provider("stub", lambda: CPUStubProvider(tokens))
+    results = {}
+    answers = {}
+    for name, call in (("stream", _stream_path), ("complete", _complete_path)):
+        for i in range(min(requests // 10, 20)):  # warm-up
+            call(i)
+        started_cpu, started = time.process_time(), time.perf_counter()
+        for i in range(requests):
+            answers[name] = call(i)
+        cpu, wall = time.process_time() - started_cpu, time.perf_counter() - started
+        results[name] = {
+            "cpu_ms_per_request": round(cpu * 1000 / requests, 3),
+            "wall_ms_per_request": round(wall * 1000 / requests, 3),
+        }
+    if answers["stream"] != answers["complete"]:
+        raise SystemExit("stream and complete paths returned different answers")
+    saved = results["stream"]["cpu_ms_per_request"] - results["complete"]["cpu_ms_per_request"]
+    results["saving"] = {
+        "cpu_ms_per_request": round(saved, 3),
+        "percent": round(saved / results["stream"]["cpu_ms_per_request"] * 100, 1),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, values in run(args.requests, args.tokens).items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
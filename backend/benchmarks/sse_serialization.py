@@ -0,0 +1,121 @@
+"""Microbenchmark for SSE frame serialization.
+
+Encodes `--answers` generated answers of `--tokens` tokens each the way
+`/api/agents/stream` does, comparing the previous string formatter (json.dumps, line
+list and join, then encoding to bytes) with the pre-encoded byte frames, with and
+without the full text repeated in the `done` event. Reports frames per second and bytes
+per answer. Also reports the JSON encoding time (averaged over 200 encodes) and
+compressed sizes for a `list_messages`-sized page.
+
+Run from backend/:
+    python -m benchmarks.sse_serialization --answers 2000 --tokens 300
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import time
+from typing import Callable, Dict, List
+
+from app.core.compression import brotli
+from app.core.serialization import dumps
+from app.core.sse import SSEFrameEncoder, encode_sse_event
+
+REQUEST_ID = "1767225600000"
+
+
+def _legacy_event(event_name: str, data: dict) -> bytes:
+    # The formatter before pre-encoding, plus the encode Starlette did on every str chunk
+    json_payload = json.dumps(data, ensure_ascii=False)
+    lines = [f"event: {event_name}", f"data: {json_payload}"]
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def _legacy(tokens: List[str]) -> int:
+    size = 0
+    full_text = ""
+    for token in tokens:
+        full_text += token
+        size += len(_legacy_event("BOT_Response", {"requestId": REQUEST_ID, "content": token}))
+    size += len(_legacy_event("done", {"requestId": REQUEST_ID, "content": full_text}))
+    return size
+
+
+def _encoded(tokens: List[str], include_full_text: bool) -> int:
+    frames = SSEFrameEncoder("BOT_Response", REQUEST_ID)
+    size = 0
+    chunks: List[str] = []
+    for token in tokens:
+        if include_full_text:
+            chunks.append(token)
+        size += len(frames.encode(token))
+    done: Dict[str, object] = {"requestId": REQUEST_ID}
+    if include_full_text:
+        done["content"] = "".join(chunks)
+    size += len(encode_sse_event("done", done))
+    return size
+
+
+def _measure(encode: Callable[[List[str]], int], answers: List[List[str]]) -> Dict[str, float]:
+    started = time.perf_counter()
+    total = sum(encode(tokens) for tokens in answers)
+    elapsed = time.perf_counter() - started
+    frames = sum(len(tokens) + 1 for tokens in answers)
+    return {
+        "frames_per_sec": round(frames / elapsed),
+        "bytes_per_answer": round(total / len(answers)),
+        "us_per_answer": round(elapsed / len(answers) * 1e6, 1),
+    }
+
+
+def _per_call_us(encode: Callable[[], bytes], repeat: int = 200) -> float:
+    encode()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    return round((time.perf_counter() - started) / repeat * 1e6, 1)
+
+
+def run(answers: int, tokens: int) -> Dict[str, Dict[str, float]]:
+    words = ["The", " answer", " uses", " naïve", " caching", ",", " \"quoted\"", " text", "\n", " 数据"]
+    corpus = [[words[(a + t) % len(words)] for t in range(tokens)] for a in range(answers)]
+    results = {
+        "legacy": _measure(_legacy, corpus),
+        "encoded": _measure(lambda t: _encoded(t, True), corpus),
+        "encoded_no_full_text": _measure(lambda t: _encoded(t, False), corpus),
+    }
+
+    page = {
+        "items": [
+            {"id": i, "chat_id": 1, "role": "user" if i % 2 else "assistant", "content": "".join(corpus[i % answers]),
+             "created_at": "2026-01-01T00:00:00"}
+            for i in range(200)
+        ],
+        "next_cursor": None,
+    }
+    fast = dumps(page)
+    results["list_messages_page"] = {
+        "json_us": _per_call_us(lambda: json.dumps(page, ensure_ascii=False).encode("utf-8")),
+        "fast_json_us": _per_call_us(lambda: dumps(page)),
+        "bytes": len(fast),
+        "gzip_bytes": len(gzip.compress(fast, compresslevel=6)),
+        "brotli_bytes": len(brotli.compress(fast, quality=4)) if brotli is not None else None,
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    for name, values in run(args.answers, args.tokens).items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cold-start benchmark for `app.main`.
+
+Imports the app in `--runs` fresh interpreters and reports wall time of the import,
+peak RSS of the process, and which heavy SDKs were pulled in at import time (none
+should be: providers, LangChain/FAISS, pandas and PyPDF2 load on first use).
+
+Run from backend/:
+    python -m benchmarks.startup --runs 5 [--json baseline.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# Modules that must not be imported just by loading the app
+HEAVY_MODULES = (
+    "langchain_community",
+    "langchain_google_genai",
+    "faiss",
+    "pandas",
+    "PyPDF2",
+    "openai",
+    "ollama",
+    "google.genai",
+)
+
+_PROBE = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import app.main  # noqa: F401
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024  # macOS reports bytes
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"import_seconds": elapsed, "max_rss_mb": rss_kb / 1024, "modules": len(sys.modules), "heavy": heavy}}))
+"""
+
+
+def _run_once(env: Dict[str, str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int) -> dict:
+    env = dict(os.environ)
+    # A throwaway database keeps the benchmark independent of local configuration
+    env.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='startup-bench-')) / 'bench.db'}")
+    samples: List[dict] = [_run_once(env) for _ in range(runs)]
+    import_times = [s["import_seconds"] for s in samples]
+    rss = [s["max_rss_mb"] for s in samples]
+    return {
+        "runs": runs,
+        "import_seconds_median": round(statistics.median(import_times), 4),
+        "import_seconds_max": round(max(import_times), 4),
+        "max_rss_mb_median": round(statistics.median(rss), 1),
+        "modules_loaded": samples[-1]["modules"],
+        "heavy_modules_loaded": samples[-1]["heavy"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Also write the result to this file")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+    if args.json is not None:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+    if result["heavy_modules_loaded"]:
+        raise SystemExit(f"heavy modules imported at startup: {', '.join(result['heavy_modules_loaded'])}")
+
+
+if __name__ == "__main__":
+    main()
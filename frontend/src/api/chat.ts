@@ -1,5 +1,5 @@
 import { httpClient } from "./client";
-import { useQuery, useMutation } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation } from "@tanstack/react-query";
 import type { QueryKey } from "@tanstack/react-query";
 import type { FileUploadResponse } from "../types/chatTypes";
 import { queryClient } from "@/utils/reactQueryUtil";
@@ -16,7 +16,13 @@ export type HistoryTurn = {
   timestamp: number;
 };
 export type HistoryResponse = { session_id: string; items: HistoryTurn[] };
-export type ChatListItem = { id: number; session_id: string; title: string };
+export type ChatListItem = {
+  id: number;
+  session_id: string;
+  title: string;
+  message_count?: number;
+  last_message_at?: string;
+};
 export type ChatMessageItem = {
   id: number;
   chat_id: number;
@@ -24,6 +30,20 @@ export type ChatMessageItem = {
   content: string;
   created_at: string;
 };
+export type Page<T> = { items: T[]; next_cursor: string | null };
+
+// Fetch one keyset page; `cursor` is the previous page's next_cursor.
+// Unchanged pages are revalidated by the browser via ETag / If-None-Match.
+async function fetchPage<T>(
+  url: string,
+  cursor: string | null,
+  params?: Record<string, unknown>
+): Promise<Page<T>> {
+  const response = await httpClient.get<Page<T>>(url, {
+    params: { ...params, cursor: cursor ?? undefined },
+  });
+  return response.data;
+}
 
 // React Query hooks and keys only
 export const chatsQueryKey = (sessionIdentifier: string): QueryKey => [
@@ -40,15 +60,16 @@ export const agentPreferencesQueryKey = (
 
 
 // React Query hooks
+// Paged hooks load the first page only; call fetchNextPage() for the rest.
 export function useChatsQuery(sessionIdentifier: string) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: chatsQueryKey(sessionIdentifier),
-    queryFn: async () => {
-      const response = await httpClient.get<ChatListItem[]>("/api/chats/", {
-        params: { session_id: sessionIdentifier },
-      });
-      return response.data;
-    },
+    queryFn: ({ pageParam }) =>
+      fetchPage<ChatListItem>("/api/chats/", pageParam, {
+        session_id: sessionIdentifier,
+      }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
   });
 }
 
@@ -57,14 +78,12 @@ export function useChatMessagesQuery(
   options?: { enabled?: boolean }
 ) {
   const enabled = options?.enabled ?? true;
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: chatMessagesQueryKey(chatId),
-    queryFn: async () => {
-      const response = await httpClient.get<ChatMessageItem[]>(
-        `/api/chats/${chatId}/messages`
-      );
-      return response.data;
-    },
+    queryFn: ({ pageParam }) =>
+      fetchPage<ChatMessageItem>(`/api/chats/${chatId}/messages`, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
     enabled,
     // Keep previously loaded messages while a refetch is in flight
     placeholderData: (prev) => prev,
@@ -163,18 +163,23 @@ export default function ChatPage() {
 
   const headerSubtitle = "Model: " + displayModel;
 
-  const { data: chatItems } = useChatMessagesQuery(currentChatId ?? -1, {
+  const {
+    data: chatPages,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useChatMessagesQuery(currentChatId ?? -1, {
     enabled: currentChatId != null,
   });
   const baseMessages: ChatMessage[] = useMemo(
     () =>
-      (chatItems ?? []).map((m) => ({
+      (chatPages?.pages.flatMap((p) => p.items) ?? []).map((m) => ({
         messageIdentifier: `${m.chat_id}:${m.id}`,
         role: m.role,
         content: m.content,
         createdAtEpochMilliseconds: Date.parse(m.created_at),
       })),
-    [chatItems]
+    [chatPages]
   );
   const mergedMessages: ChatMessage[] = useMemo(
     () => mergeMessages(baseMessages, overlayMessages),
@@ -231,7 +236,13 @@ export default function ChatPage() {
             </div> */}
 
             <div className="messageListWrapper">
-              <MessageList messages={shownMessages} isBusy={isBusy} />
+              <MessageList
+                messages={shownMessages}
+                isBusy={isBusy}
+                hasMore={currentChatId != null && hasNextPage}
+                isLoadingMore={isFetchingNextPage}
+                onLoadMore={() => fetchNextPage()}
+              />
             </div>
 
             <MessageComposer
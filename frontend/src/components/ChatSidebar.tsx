@@ -10,7 +10,8 @@ export default function ChatSidebar(parameters: {
   onSelectChat: (chatId: number | null) => void;
 }) {
   const { sessionIdentifier, currentChatId, onSelectChat } = parameters;
-  const { data: chats = [], isLoading } = useChatsQuery(sessionIdentifier);
+  const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useChatsQuery(sessionIdentifier);
+  const chats = data?.pages.flatMap((p) => p.items) ?? [];
   const deleteChatMutation = useDeleteChatMutation(sessionIdentifier);
 
   return (
@@ -44,6 +45,11 @@ export default function ChatSidebar(parameters: {
             </li>
           ))}
         </ul>
+        {hasNextPage && (
+          <Button variant="outline" onClick={() => fetchNextPage()} disabled={isFetchingNextPage} className="w-full mt-2 text-sm">
+            {isFetchingNextPage ? "Loading..." : "Load more"}
+          </Button>
+        )}
       </div>
     </aside>
   );
@@ -4,7 +4,15 @@ import type { ChatMessage } from "../types/chatTypes";
 import { renderMarkdownToReact } from "../lib/markdownRenderer";
 import { Button } from "./ui/button";
 
-export default function MessageList(parameters: { messages: ChatMessage[]; isBusy: boolean; lastStreamingToken?: string; showThinking?: boolean }) {
+export default function MessageList(parameters: {
+  messages: ChatMessage[];
+  isBusy: boolean;
+  lastStreamingToken?: string;
+  showThinking?: boolean;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
+}) {
   const listRef = useRef<HTMLDivElement | null>(null);
   const endRef = useRef<HTMLDivElement | null>(null);
   const [isAtBottom, setIsAtBottom] = useState(true);
@@ -76,6 +84,15 @@ export default function MessageList(parameters: { messages: ChatMessage[]; isBus
         );
       })}
 
+      {/* Messages are paged oldest first, so the next page holds newer ones */}
+      {parameters.hasMore && parameters.onLoadMore && (
+        <div className="flex justify-center py-2">
+          <Button variant="outline" onClick={parameters.onLoadMore} disabled={parameters.isLoadingMore}>
+            {parameters.isLoadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
+
       <div ref={endRef} />
 
       {isOverflowing && !isAtBottom && (